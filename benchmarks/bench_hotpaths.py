@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Hot Path Microbenchmarks
+Per-row CPU cost of the pure-Python work the bots do for every prospect or
+post, on synthetic datasets of 1k / 100k / 1M rows. Results are written as
+JSON and compared against a stored baseline; anything slower than the
+baseline by more than the tolerance is reported and the run exits 1.
+Author: Greg Pober
+
+Datasets cycle through a pool of 100k distinct rows, so the 1M run costs
+the same memory as the 100k one. Timings only compare on the same machine:
+record the baseline where the comparison will run.
+
+Usage:
+    python benchmarks/bench_hotpaths.py                       # all sizes, compare to baseline
+    python benchmarks/bench_hotpaths.py --sizes 1k,100k --output results.json
+    python benchmarks/bench_hotpaths.py --save-baseline       # accept current numbers
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from datetime import time as clock
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'scripts'))
+
+import email_bot  # noqa: E402
+import followup_bot  # noqa: E402
+import social_media_bot  # noqa: E402
+import upload_prospects  # noqa: E402
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1M': 1_000_000}
+POOL_SIZE = 100_000
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline_hotpaths.json')
+DEFAULT_TOLERANCE = 0.50  # 50% slower than baseline = regression (shared CI boxes jitter ~30-60%)
+MIN_ROWS_TIMED = 300_000  # small datasets get extra passes so each timing isn't just noise
+
+# Free-text industries as they arrive from lead lists, plus some that match nothing
+INDUSTRIES = ['Commercial HVAC', 'HVAC Services', 'Restaurants', 'Restaurant & Bar', 'Construction',
+              'General Contractor / Construction', 'Property Management', 'Real Estate', 'Dental Practice',
+              'Medical Practice', 'Manufacturing', 'Law Firm', 'Legal Services', 'Landscaping',
+              'Auto Repair', 'Retail', 'E-commerce', 'Plumbing', 'Roofing', 'Trucking & Logistics',
+              'Accounting', 'Marketing Agency', 'Software', 'Nonprofit', '', None]
+FIRST_NAMES = ['Jordan', 'Sam', 'Alex', 'Priya', 'Luis', 'Mei', 'Dana', '', None]
+
+
+def make_prospects(count, rng):
+    """Prospect rows as the bots receive them from Supabase"""
+    return [{
+        'id': f'00000000-0000-4000-8000-{i:012d}',
+        'email': f'owner{i}@example{i % 997}.com',
+        'first_name': rng.choice(FIRST_NAMES),
+        'company': f'Example Co {i}',
+        'title': 'Owner',
+        'industry': rng.choice(INDUSTRIES) if rng.random() < 0.95 else f'Niche industry {i % 5000}',
+        'sequence_step': rng.choice((1, 2, 3)),
+    } for i in range(count)]
+
+
+def make_csv_rows(count, rng):
+    """Raw csv.DictReader rows, untrimmed, some columns missing"""
+    rows = []
+    for i in range(count):
+        row = {
+            'email': f'  Owner{i}@Example{i % 997}.com ',
+            'first_name': f' {rng.choice(FIRST_NAMES) or ""} ',
+            'last_name': 'Tester',
+            'company': f'Example Co {i}  ',
+            'industry': f' {rng.choice(INDUSTRIES) or ""}',
+        }
+        if rng.random() < 0.5:
+            row.update(title='Owner ', revenue_estimate='$5M-$10M', source='apollo')
+        rows.append(row)
+    return rows
+
+
+def make_posts(count, rng):
+    """social_media_posts rows for today at random times"""
+    return [{'id': i, 'scheduled_time': f'{rng.randrange(24):02d}:{rng.randrange(60):02d}:00'}
+            for i in range(count)]
+
+
+def cycled(pool, count):
+    """count rows, repeating the pool as needed"""
+    return (pool * (count // len(pool) + 1))[:count]
+
+
+# name -> (dataset, function run once per row)
+BENCHMARKS = {
+    'generate_tracking_link': ('prospects', lambda p: email_bot.generate_tracking_link(
+        'initial_outreach', 'email', 'campaign', p['email'], p['industry'])),
+    'get_industry_template': ('prospects', lambda p: email_bot.get_industry_template(p['industry'])),
+    'get_industry_followup': ('prospects', lambda p: followup_bot.get_industry_followup(
+        p['industry'], p['sequence_step'])),
+    'render_initial_email': ('prospects', email_bot.fallback_personalization),
+    'render_followup': ('prospects', lambda p: followup_bot.render_followup(p, p['sequence_step'])),
+    'normalize_csv_row': ('csv_rows', upload_prospects.normalize_row),
+}
+# filter_due_posts takes the whole list at once; time it as if the bot ran at noon
+POSTS_NOON = clock(12, 0)
+
+
+def best_time(run, repeat):
+    """Best wall time of run() over repeat calls, with the GC off like timeit"""
+    best = float('inf')
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return best
+
+
+def run_benchmark(func, rows, repeat):
+    """Best time for one pass of func over every row"""
+    def run():
+        for row in rows:
+            func(row)
+    return best_time(run, repeat)
+
+
+def run_posts_filter(rows, repeat):
+    return best_time(lambda: social_media_bot.filter_due_posts(rows, POSTS_NOON), repeat)
+
+
+def run_suite(sizes, repeat, seed):
+    """{'bench/size': {'rows', 'seconds', 'ns_per_row', 'rows_per_sec'}}"""
+    rng = random.Random(seed)
+    pools = {
+        'prospects': make_prospects(POOL_SIZE, rng),
+        'csv_rows': make_csv_rows(POOL_SIZE, rng),
+        'posts': make_posts(POOL_SIZE, rng),
+    }
+
+    results = {}
+    for label in sizes:
+        count = SIZES[label]
+        passes = max(repeat, MIN_ROWS_TIMED // count)
+        datasets = {name: cycled(pool, count) for name, pool in pools.items()}
+
+        timings = [(name, run_benchmark(func, datasets[dataset], passes))
+                   for name, (dataset, func) in BENCHMARKS.items()]
+        timings.append(('filter_due_posts', run_posts_filter(datasets['posts'], passes)))
+
+        for name, seconds in timings:
+            results[f'{name}/{label}'] = {
+                'rows': count,
+                'seconds': seconds,
+                'ns_per_row': seconds / count * 1e9,
+                'rows_per_sec': count / seconds,
+            }
+            print(f"  {name:<24} {label:>5}  {seconds / count * 1e9:>9.0f} ns/row  {count / seconds:>12,.0f} rows/s")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print current vs baseline per benchmark. Returns the names that regressed"""
+    regressions = []
+    print(f"\n{'benchmark':<32} {'baseline ns':>12} {'now ns':>10} {'ratio':>7}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<32} {'-':>12} {current['ns_per_row']:>10.0f} {'new':>7}")
+            continue
+        ratio = current['ns_per_row'] / previous['ns_per_row']
+        flag = ''
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = '  ❌ REGRESSION'
+        print(f"{name:<32} {previous['ns_per_row']:>12.0f} {current['ns_per_row']:>10.0f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks for the per-row hot paths')
+    parser.add_argument('--sizes', default=','.join(SIZES), help=f'comma-separated subset of {",".join(SIZES)}')
+    parser.add_argument('--repeat', type=int, default=3, help='passes per benchmark, at least (best is kept)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown vs baseline before failing (0.5 = 50%%)')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    args = parser.parse_args()
+
+    sizes = args.sizes.split(',')
+    print(f"🏁 Hot path benchmarks: {', '.join(sizes)} rows, best of {args.repeat}")
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'seed': args.seed,
+        },
+        'results': run_suite(sizes, args.repeat, args.seed),
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ No baseline at {args.baseline} - run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(report['results'], baseline['results'], args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) regressed more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+
+    print(f"\n✅ No regressions beyond {args.tolerance:.0%} (baseline from {baseline['meta']['timestamp']})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
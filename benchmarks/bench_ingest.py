@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Prospect Ingest Benchmark
+Compares the two upload_prospects engines on a synthetic lead list: the
+row loop (csv.DictReader + normalize_row + dedupe) and the
+columnar pyarrow path (streaming CSV reader + stream_batches). Times the
+cleaning alone and cleaning plus turning the result into upsert batches,
+and the same list as Parquet (memory-mapped, streamed in record batches).
+Author: Greg Pober
+
+Usage:
+    python benchmarks/bench_ingest.py                   # 100k and 1M rows
+    python benchmarks/bench_ingest.py --rows 2000000 --duplicates 0.1
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'scripts'))
+
+import prospect_table  # noqa: E402
+import upload_prospects  # noqa: E402
+
+BATCH_SIZE = 500
+
+
+def write_lead_list(path, count, duplicates, invalid, seed):
+    """Vendor-style CSV: untrimmed, mixed-case emails, some repeats and some junk"""
+    rng = random.Random(seed)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['email', 'first_name', 'last_name', 'company', 'title', 'industry', 'source'])
+        for i in range(count):
+            roll = rng.random()
+            if roll < invalid:
+                email = f'owner{i} at example.com'
+            elif roll < invalid + duplicates:
+                email = f' Owner{rng.randrange(i or 1)}@Example.com'
+            else:
+                email = f' Owner{i}@Example.com '
+            writer.writerow([email, ' Jordan ', 'Tester', f'Example Co {i} ', 'Owner',
+                             rng.choice(['Commercial HVAC', 'Restaurants', 'Construction', '']), 'vendor'])
+
+
+def rows_engine(path, to_batches):
+    accepted = 0
+    batches = upload_prospects.CSVBatches(path, BATCH_SIZE)
+    for offset, batch in batches:
+        accepted += len(batch)
+        batches.landed(offset)
+    return accepted
+
+
+def arrow_engine(path, to_batches=True):
+    # Skipping every offset cleans the file without converting batches to dicts
+    skip = () if to_batches else range(0, 1 << 62, BATCH_SIZE)
+    counts = []
+    for _ in prospect_table.stream_batches(prospect_table.open_source(path), BATCH_SIZE, skip,
+                                           on_done=lambda rows, accepted, rejected: counts.append(accepted)):
+        pass
+    return counts[0]
+
+
+def best_time(run, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Row loop vs columnar CSV ingest')
+    parser.add_argument('--rows', default='100000,1000000', help='comma-separated dataset sizes')
+    parser.add_argument('--duplicates', type=float, default=0.05, help='fraction of rows repeating an earlier email')
+    parser.add_argument('--invalid', type=float, default=0.01, help='fraction of rows with a malformed email')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if not prospect_table.available():
+        print("❌ pyarrow is not installed: pip install pyarrow")
+        return 1
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    print(f"🏁 CSV ingest: row loop vs pyarrow, best of {args.repeat}")
+    print(f"{'rows':>10} {'engine':<8} {'stage':<16} {'seconds':>9} {'rows/s':>12} {'accepted':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for count in (int(size) for size in args.rows.split(',')):
+            path = os.path.join(workdir, f'leads_{count}.csv')
+            write_lead_list(path, count, args.duplicates, args.invalid, args.seed)
+            for stage, to_batches in (('clean', False), ('clean+batches', True)):
+                rows_seconds, rows_accepted = best_time(lambda: rows_engine(path, to_batches), args.repeat)
+                arrow_seconds, arrow_accepted = best_time(lambda: arrow_engine(path, to_batches), args.repeat)
+                print(f"{count:>10} {'rows':<8} {stage:<16} {rows_seconds:>9.3f} {count / rows_seconds:>12,.0f} "
+                      f"{rows_accepted:>10}")
+                print(f"{count:>10} {'arrow':<8} {stage:<16} {arrow_seconds:>9.3f} {count / arrow_seconds:>12,.0f} "
+                      f"{arrow_accepted:>10} {rows_seconds / arrow_seconds:>7.1f}x")
+
+            parquet_path = path.replace('.csv', '.parquet')
+            pq.write_table(pa_csv.read_csv(path), parquet_path)
+            parquet_seconds, parquet_accepted = best_time(lambda: arrow_engine(parquet_path), args.repeat)
+            print(f"{count:>10} {'parquet':<8} {'clean+batches':<16} {parquet_seconds:>9.3f} "
+                  f"{count / parquet_seconds:>12,.0f} {parquet_accepted:>10} {rows_seconds / parquet_seconds:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Startup Benchmark
+Cold import time of each script in a fresh interpreter, and which of the
+heavy SDKs got imported along the way. Point it at another checkout's
+scripts/ directory to compare before and after.
+Author: Greg Pober
+
+Usage: python benchmarks/bench_startup.py [scripts_dir] [runs]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts')
+MODULES = ('email_bot', 'followup_bot', 'social_media_bot', 'prepare_personalization', 'upload_prospects')
+HEAVY_SDKS = ('supabase', 'sendgrid', 'anthropic', 'requests')
+
+# Placeholder credentials so scripts that validate at import get past it - nothing connects
+DUMMY_ENV = {
+    'SUPABASE_URL': 'http://127.0.0.1:9',
+    'SUPABASE_SERVICE_KEY': 'dummy.service.key',
+    'SENDGRID_API_KEY': 'SG.dummy',
+    'ANTHROPIC_API_KEY': 'dummy',
+    'PERSONALIZATION_CACHE': 'off',
+}
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {scripts_dir!r})
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{'seconds': elapsed, 'sdks': [m for m in {sdks!r} if m in sys.modules]}}))
+"""
+
+
+def measure(scripts_dir, module):
+    """Import module in a new interpreter. Returns {'seconds', 'sdks'}"""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(scripts_dir=scripts_dir, module=module, sdks=HEAVY_SDKS)],
+        env=dict(os.environ, **DUMMY_ENV), capture_output=True, text=True, cwd=scripts_dir
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module}: {result.stderr.strip().splitlines()[-1]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    scripts_dir = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SCRIPTS_DIR)
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print(f"Cold import of {scripts_dir} (best of {runs})")
+    print(f"{'script':<26} {'import ms':>10}  SDKs loaded")
+    for module in MODULES:
+        if not os.path.exists(os.path.join(scripts_dir, f'{module}.py')):
+            continue
+        try:
+            samples = [measure(scripts_dir, module) for _ in range(runs)]
+        except RuntimeError as e:
+            print(f"{module:<26} {'failed':>10}  {e}")
+            continue
+        best = min(sample['seconds'] for sample in samples)
+        print(f"{module:<26} {best * 1000:>10.0f}  {', '.join(samples[0]['sdks']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
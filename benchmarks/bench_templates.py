@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Template Rendering Benchmark
+Renders per second for every email template: str.format over the raw HTML
+(how the bots rendered before) vs the pre-compiled segments in
+scripts/email_templates.py.
+Author: Greg Pober
+
+Usage: python benchmarks/bench_templates.py [renders per template]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from email_templates import (  # noqa: E402
+    EMAIL_HTML_1, FALLBACK_INDUSTRY_HTML, FOLLOWUP_1_HTML, FOLLOWUP_2_HTML, FOLLOWUP_3_HTML,
+    INDUSTRY_FOLLOWUPS, INDUSTRY_PAIN_POINTS, PAIN_POINT_FIELDS,
+    INITIAL_EMAIL, FALLBACK_EMAILS, FOLLOWUP_TEMPLATES
+)
+
+VALUES = {
+    'first_name': 'Jordan',
+    'industry': 'hvac',
+    'tracking_link': 'https://info.iamcfo.com?utm_source=email&utm_medium=followup'
+                     '&utm_campaign=followup_1&utm_content=jordan@example.com&utm_term=hvac',
+}
+
+
+def cases():
+    """(name, render before, render after) for every template"""
+    yield 'EMAIL_HTML_1', lambda: EMAIL_HTML_1.format(**VALUES), lambda: INITIAL_EMAIL.render(VALUES)
+
+    # Fallback industry email used to be an f-string rebuilt with the pain point text each time
+    for key, pain_points in INDUSTRY_PAIN_POINTS.items():
+        fields = dict(VALUES, **{field: pain_points[field] for field in PAIN_POINT_FIELDS})
+        template = FALLBACK_EMAILS[key][1]
+        yield (f'fallback[{key}]',
+               lambda fields=fields: FALLBACK_INDUSTRY_HTML.format(**fields),
+               lambda template=template: template.render(VALUES))
+
+    generic = {1: FOLLOWUP_1_HTML, 2: FOLLOWUP_2_HTML, 3: FOLLOWUP_3_HTML}
+    for (key, step), (_, template) in FOLLOWUP_TEMPLATES.items():
+        source = generic[step] if key is None else INDUSTRY_FOLLOWUPS[key][f'followup_{step}']
+        yield (f'followup[{key or "generic"}][{step}]',
+               lambda source=source: source.format(**VALUES),
+               lambda template=template: template.render(VALUES))
+
+
+def rate(func, count):
+    """Renders per second over count calls"""
+    started = time.perf_counter()
+    for _ in range(count):
+        func()
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print(f"{'template':<34} {'before/s':>12} {'after/s':>12} {'speedup':>8}")
+    total_before = total_after = 0.0
+    for name, before, after in cases():
+        assert before() == after(), f"{name}: compiled output differs"
+        before_rate = rate(before, count)
+        after_rate = rate(after, count)
+        total_before += 1 / before_rate
+        total_after += 1 / after_rate
+        print(f"{name:<34} {before_rate:>12,.0f} {after_rate:>12,.0f} {after_rate / before_rate:>7.1f}x")
+
+    print(f"{'all templates (one render each)':<34} {1 / total_before:>12,.0f} {1 / total_after:>12,.0f} "
+          f"{total_before / total_after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
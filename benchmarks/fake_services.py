@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Local Stand-in Services
+One local HTTP server that answers the parts of PostgREST (Supabase), the
+SendGrid v3 mail endpoint, the Anthropic messages and Message Batches
+endpoints and LinkedIn ugcPosts that the scripts actually call, backed by in-memory tables. Latency,
+server errors and 429s can be injected per service to see how the bots hold up.
+Author: Greg Pober
+
+Usage:
+    python benchmarks/fake_services.py [--port 8787] [--latency-ms 50] [--throttle-rate 0.05]
+    # then export the printed variables and run any bot against it
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import urllib.parse
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SERVICES = ('postgrest', 'sendgrid', 'anthropic', 'linkedin')
+
+# Columns compared as timestamps rather than strings
+TIMESTAMP_COLUMNS = {'email_sent_at', 'last_followup_at', 'created_at', 'updated_at', 'posted_at'}
+
+# Unique column PostgREST would resolve an upsert on, per table
+PRIMARY_KEYS = {'prospects': 'id', 'social_media_posts': 'id', 'personalization_cache': 'key'}
+
+# Column defaults from the schema that the scripts filter on
+COLUMN_DEFAULTS = {
+    'prospects': {'email_sent': False, 'email_sent_at': None, 'sequence_step': 0, 'replied': False,
+                  'content_hash': None},
+    'social_media_posts': {'status': 'pending', 'platform': 'linkedin', 'scheduled_time': '09:00:00'},
+    'personalization_cache': {},
+}
+
+FAKE_EMAIL_HTML = """<p>Hi {first_name},</p>
+<p>Most owners we talk to find out about a cash crunch weeks after it starts.</p>
+<p>I AM CFO turns your QuickBooks data into a live cash flow view: <a href="{tracking_link}">see it here</a>.</p>
+<p>Greg</p>"""
+
+FAKE_POST_TEXT = """Month-end shouldn't be the first time you see your numbers.
+
+Real-time cash flow. 3 seconds, not 3 hours.
+
+#CashFlow #SmallBusiness #QuickBooks"""
+
+
+# ===== FAULT INJECTION =====
+
+class Faults:
+    """Latency, error and throttle settings, applied to the listed services"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, throttle_rate=0.0,
+                 retry_after=1, services=SERVICES, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.services = set(services)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def apply(self, service):
+        """Sleep for the configured latency, then return 429/500 or None"""
+        if service not in self.services:
+            return None
+
+        with self.lock:
+            delay = self.latency_ms + self.random.uniform(0, self.jitter_ms)
+            roll = self.random.random()
+
+        if delay:
+            time.sleep(delay / 1000)
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 500
+        return None
+
+    def errored(self, service):
+        """Whether one request inside a batch fails (error and throttle rates combined, no latency)"""
+        if service not in self.services:
+            return False
+        with self.lock:
+            return self.random.random() < self.throttle_rate + self.error_rate
+
+
+# ===== POSTGREST =====
+
+def _timestamp(value):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _split(text):
+    """Split on commas that aren't inside parentheses or double quotes"""
+    parts, depth, quoted, current = [], 0, False, ''
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    parts.append(current)
+    return parts
+
+
+def _coerce(column, raw, sample):
+    """Query-string value converted to compare against a stored value"""
+    raw = raw.strip('"')
+    if raw == 'null':
+        return None
+    if column in TIMESTAMP_COLUMNS:
+        return _timestamp(raw)
+    if isinstance(sample, bool):
+        return raw.lower() == 'true'
+    if isinstance(sample, int):
+        return int(raw)
+    if isinstance(sample, float):
+        return float(raw)
+    return raw
+
+
+def _stored(column, value):
+    return _timestamp(value) if column in TIMESTAMP_COLUMNS and value is not None else value
+
+
+COMPARISONS = {
+    'eq': lambda a, b: a == b,
+    'neq': lambda a, b: a != b,
+    'gt': lambda a, b: a > b,
+    'gte': lambda a, b: a >= b,
+    'lt': lambda a, b: a < b,
+    'lte': lambda a, b: a <= b,
+}
+
+
+def parse_condition(column, expression):
+    """'gt.5' / 'in.(1,2)' / 'not.is.null' on column -> predicate(row)"""
+    op, _, value = expression.partition('.')
+
+    if op == 'not':
+        inner = parse_condition(column, value)
+        return lambda row: not inner(row)
+    if op == 'is':
+        expected = {'null': None, 'true': True, 'false': False}[value]
+        return lambda row: row.get(column) is expected
+    if op == 'in':
+        options = _split(value[1:-1])
+        return lambda row: row.get(column) is not None and \
+            _stored(column, row[column]) in [_coerce(column, option, row[column]) for option in options]
+
+    compare = COMPARISONS[op]
+    return lambda row: row.get(column) is not None and \
+        compare(_stored(column, row[column]), _coerce(column, value, row[column]))
+
+
+def parse_logic(expression, combine):
+    """'(a.eq.1,and(b.gt.2,c.lt.3))' -> predicate(row), items joined with combine (any/all)"""
+    predicates = []
+    for item in _split(expression[1:-1]):
+        if item.startswith(('and(', 'or(')):
+            name, _, rest = item.partition('(')
+            predicates.append(parse_logic('(' + rest, all if name == 'and' else any))
+        else:
+            column, _, condition = item.partition('.')
+            predicates.append(parse_condition(column, condition))
+    return lambda row: combine(predicate(row) for predicate in predicates)
+
+
+def parse_filters(params):
+    """Predicate over rows for every filter in the query string"""
+    predicates = []
+    for key, value in params:
+        if key in ('select', 'order', 'limit', 'offset', 'on_conflict', 'columns'):
+            continue
+        if key in ('or', 'and'):
+            predicates.append(parse_logic(value, any if key == 'or' else all))
+        else:
+            predicates.append(parse_condition(key, value))
+    return lambda row: all(predicate(row) for predicate in predicates)
+
+
+def sort_rows(rows, order):
+    """Apply order=col.asc,col2.desc (nulls last on asc, first on desc, like Postgres)"""
+    for term in reversed(order.split(',')):
+        column, *flags = term.split('.')
+        descending = 'desc' in flags
+
+        def key(row, column=column):
+            value = row.get(column)
+            return (value is None, _stored(column, value) if value is not None else 0)
+
+        rows.sort(key=key, reverse=descending)
+    return rows
+
+
+class Store:
+    """In-memory tables plus per-row timing marks for latency reporting"""
+
+    def __init__(self):
+        self.tables = {name: {} for name in PRIMARY_KEYS}
+        self.lock = threading.Lock()
+        self.served = {}    # (table, id) -> first time the row was returned by a read
+        self.finished = {}  # (table, id) -> last time a write touched it
+
+    def reset_marks(self):
+        with self.lock:
+            self.served.clear()
+            self.finished.clear()
+
+    def latencies(self, table, since):
+        """Seconds from first read (or since, for rows never read) to last write, per written row"""
+        with self.lock:
+            return [finished - self.served.get((name, row_id), since)
+                    for (name, row_id), finished in self.finished.items() if name == table]
+
+    def insert(self, table, rows, on_conflict=None):
+        """Insert (or merge on on_conflict) rows. Returns the stored rows"""
+        now = datetime.now(timezone.utc).isoformat()
+        stored = []
+        with self.lock:
+            existing = self.tables[table]
+            index = {row.get(on_conflict): row for row in existing.values()} if on_conflict else {}
+            for row in rows:
+                match = index.get(row.get(on_conflict)) if on_conflict else None
+                if match is not None:
+                    match.update(row)
+                    row = match
+                else:
+                    row = dict(COLUMN_DEFAULTS[table], **row)
+                    row.setdefault(PRIMARY_KEYS[table], str(uuid.uuid4()))
+                    row.setdefault('created_at', now)
+                    existing[row[PRIMARY_KEYS[table]]] = row
+                    if on_conflict:
+                        index[row.get(on_conflict)] = row
+                self.finished[(table, row[PRIMARY_KEYS[table]])] = time.monotonic()
+                stored.append(dict(row))
+        return stored
+
+    def select(self, table, params):
+        """(rows, total before limit) for a PostgREST read"""
+        query = dict(params)
+        matches = parse_filters(params)
+        with self.lock:
+            rows = [row for row in self.tables[table].values() if matches(row)]
+            if 'order' in query:
+                sort_rows(rows, query['order'])
+            total = len(rows)
+            offset = int(query.get('offset', 0))
+            rows = rows[offset:offset + int(query['limit'])] if 'limit' in query else rows[offset:]
+
+            now = time.monotonic()
+            for row in rows:
+                self.served.setdefault((table, row[PRIMARY_KEYS[table]]), now)
+
+            columns = query.get('select', '*')
+            if columns != '*':
+                names = columns.split(',')
+                rows = [{name: row.get(name) for name in names} for row in rows]
+            else:
+                rows = [dict(row) for row in rows]
+        return rows, total
+
+    def update(self, table, params, values):
+        matches = parse_filters(params)
+        updated = []
+        with self.lock:
+            now = time.monotonic()
+            for row in self.tables[table].values():
+                if matches(row):
+                    row.update(values)
+                    self.finished[(table, row[PRIMARY_KEYS[table]])] = now
+                    updated.append(dict(row))
+        return updated
+
+    def update_many(self, table, changes):
+        """{id: {column: value}} applied in one locked pass. Returns rows changed"""
+        with self.lock:
+            now = time.monotonic()
+            rows = self.tables[table]
+            count = 0
+            for row_id, values in changes.items():
+                if row_id in rows:
+                    rows[row_id].update(values)
+                    self.finished[(table, row_id)] = now
+                    count += 1
+        return count
+
+    def campaign_stats(self):
+        with self.lock:
+            rows = list(self.tables['prospects'].values())
+        stats = {
+            'total': len(rows),
+            'sent': sum(1 for row in rows if row.get('email_sent')),
+            'replied': sum(1 for row in rows if row.get('replied')),
+        }
+        for step in (1, 2, 3, 4):
+            stats[f'step_{step}'] = sum(1 for row in rows if row.get('sequence_step') == step)
+        return stats
+
+    def rpc(self, name, args):
+        """Database functions from database/migrations, or KeyError"""
+        if name == 'mark_prospects_emailed':
+            return self.update_many('prospects', {
+                row_id: {'email_sent': True, 'email_sent_at': sent_at, 'sequence_step': 1}
+                for row_id, sent_at in zip(args['p_ids'], args['p_sent_at'])
+            })
+        if name == 'advance_prospects_followup':
+            return self.update_many('prospects', {
+                row_id: {'sequence_step': step, 'last_followup_at': followup_at}
+                for row_id, step, followup_at in zip(args['p_ids'], args['p_next_steps'], args['p_followup_at'])
+            })
+        if name == 'get_campaign_stats':
+            return self.campaign_stats()
+        if name in ('update_daily_snapshot', 'evict_personalization_cache'):
+            return None
+        raise KeyError(name)
+
+
+# ===== HTTP =====
+
+class Metrics:
+    """Request, email and fault counters per service"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def add(self, service, field, amount=1):
+        with self.lock:
+            counts = self.counts.setdefault(service, {})
+            counts[field] = counts.get(field, 0) + amount
+
+    def snapshot(self):
+        with self.lock:
+            return {service: dict(counts) for service, counts in self.counts.items()}
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so client connection pooling behaves as in production
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def services(self):
+        return self.server.services
+
+    def read_json(self):
+        return json.loads(self.body) if self.body else None
+
+    def reply(self, status, body=None, headers=None):
+        payload = b'' if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def route(self):
+        """(service, handler) for the request path"""
+        path = urllib.parse.urlparse(self.path).path
+        if path.startswith('/rest/v1/'):
+            return 'postgrest', self.handle_postgrest
+        if path == '/v3/mail/send':
+            return 'sendgrid', self.handle_sendgrid
+        if path == '/v1/messages':
+            return 'anthropic', self.handle_anthropic
+        if path.startswith('/v1/messages/batches'):
+            return 'anthropic', self.handle_anthropic_batches
+        if path == '/v2/ugcPosts':
+            return 'linkedin', self.handle_linkedin
+        return None, None
+
+    def dispatch(self):
+        # Always consume the body (postgrest-py sends "{}" even on GETs) so keep-alive stays in sync
+        self.body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        service, handler = self.route()
+        if handler is None:
+            self.reply(404, {'message': f'no fake for {self.command} {self.path}'})
+            return
+
+        self.services.metrics.add(service, 'requests')
+        fault = self.services.faults.apply(service)
+        if fault:
+            self.services.metrics.add(service, f'http_{fault}')
+            self.reply(fault, self.error_body(service, fault),
+                       {'Retry-After': str(self.services.faults.retry_after)} if fault == 429 else None)
+            return
+        handler()
+
+    do_GET = do_POST = do_PATCH = dispatch
+
+    def error_body(self, service, status):
+        if service == 'anthropic':
+            kind = 'rate_limit_error' if status == 429 else 'api_error'
+            return {'type': 'error', 'error': {'type': kind, 'message': f'injected {status}'}}
+        if service == 'postgrest':
+            return {'code': 'FAKE', 'message': f'injected {status}', 'details': None, 'hint': None}
+        return {'errors': [{'message': f'injected {status}'}]}
+
+    def handle_postgrest(self):
+        store = self.services.store
+        url = urllib.parse.urlparse(self.path)
+        params = urllib.parse.parse_qsl(url.query, keep_blank_values=True)
+        name = url.path[len('/rest/v1/'):]
+        prefer = self.headers.get('Prefer', '')
+
+        if name.startswith('rpc/'):
+            try:
+                self.reply(200, store.rpc(name[4:], self.read_json() or {}))
+            except KeyError:
+                self.reply(404, {'code': 'PGRST202', 'message': f'Could not find the function {name[4:]}',
+                                 'details': None, 'hint': None})
+            return
+
+        if name not in store.tables:
+            self.reply(404, {'code': '42P01', 'message': f'relation "{name}" does not exist',
+                             'details': None, 'hint': None})
+            return
+
+        if self.command == 'GET':
+            rows, total = store.select(name, params)
+            headers = {}
+            if 'count=exact' in prefer:
+                headers['Content-Range'] = f'0-{len(rows) - 1}/{total}' if rows else f'*/{total}'
+            self.reply(200, rows, headers)
+        elif self.command == 'PATCH':
+            self.reply(200, store.update(name, params, self.read_json()))
+        else:
+            body = self.read_json()
+            rows = body if isinstance(body, list) else [body]
+            upsert = 'merge-duplicates' in prefer
+            on_conflict = dict(params).get('on_conflict', PRIMARY_KEYS[name]) if upsert else None
+            self.reply(201, store.insert(name, rows, on_conflict))
+
+    def handle_sendgrid(self):
+        message = self.read_json()
+        recipients = sum(len(personalization.get('to', [])) for personalization in message['personalizations'])
+        self.services.metrics.add('sendgrid', 'emails', recipients)
+        self.reply(202)
+
+    def handle_anthropic(self):
+        self.reply(200, self.fake_message(self.read_json()))
+
+    def fake_message(self, request):
+        """Messages API response for one request: canned email or post text, usage with prompt caching"""
+        prompt = json.dumps(request)
+        text = FAKE_POST_TEXT if 'LinkedIn' in prompt else FAKE_EMAIL_HTML
+
+        # Emulate prompt caching: the first request with a given system prompt writes it, later ones read it
+        system = json.dumps(request.get('system', ''))
+        system_tokens = len(system) // 4
+        cache_read = cache_write = 0
+        if 'cache_control' in system:
+            digest = hashlib.sha256(system.encode()).hexdigest()
+            with self.services.lock:
+                seen = digest in self.services.cached_prompts
+                self.services.cached_prompts.add(digest)
+            cache_read, cache_write = (system_tokens, 0) if seen else (0, system_tokens)
+
+        self.services.metrics.add('anthropic', 'messages')
+        return {
+            'id': f'msg_{uuid.uuid4().hex[:24]}',
+            'type': 'message',
+            'role': 'assistant',
+            'model': request.get('model', 'fake'),
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {
+                'input_tokens': (len(prompt) - len(system)) // 4 + (0 if cache_read or cache_write else system_tokens),
+                'output_tokens': len(text) // 4,
+                'cache_creation_input_tokens': cache_write,
+                'cache_read_input_tokens': cache_read,
+            },
+        }
+
+    def handle_anthropic_batches(self):
+        """
+        POST /v1/messages/batches, GET /v1/messages/batches/{id}, .../{id}/results
+        and POST .../{id}/cancel
+
+        Requests are answered when the batch is created; the batch reports
+        in_progress on its first retrieve and ended from then on, so callers
+        go through one poll. Faults error some requests inside a batch.
+        """
+        parts = urllib.parse.urlparse(self.path).path.split('/')[4:]
+        if self.command == 'POST' and not parts:
+            self.reply(200, self.services.create_batch(
+                [(entry['custom_id'], self.batch_result(entry['params'])) for entry in self.read_json()['requests']]))
+            return
+
+        batch = self.services.batches.get(parts[0]) if parts else None
+        if batch is None:
+            self.reply(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': 'no such batch'}})
+        elif parts[1:] == ['cancel'] and self.command == 'POST':
+            self.reply(200, self.services.cancel_batch(parts[0]))
+        elif parts[1:] == ['results']:
+            if batch['info']['processing_status'] != 'ended':
+                self.reply(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': 'batch not ended'}})
+                return
+            payload = ''.join(json.dumps({'custom_id': custom_id, 'result': result}) + '\n'
+                              for custom_id, result in batch['results']).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/binary')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        else:
+            self.reply(200, self.services.poll_batch(parts[0]))
+
+    def batch_result(self, params):
+        self.services.metrics.add('anthropic', 'batch_requests')
+        if self.services.faults.errored('anthropic'):
+            return {'type': 'errored', 'error': {'type': 'error', 'error': {'type': 'api_error',
+                                                                            'message': 'injected 500'}}}
+        return {'type': 'succeeded', 'message': self.fake_message(params)}
+
+    def handle_linkedin(self):
+        self.read_json()
+        self.services.metrics.add('linkedin', 'posts')
+        self.reply(201, {'id': f'urn:li:share:{uuid.uuid4().int % 10 ** 19}'})
+
+
+class FakeServices:
+    """All four stand-ins on one local port, served from a background thread"""
+
+    def __init__(self, host='127.0.0.1', port=0, faults=None):
+        self.store = Store()
+        self.metrics = Metrics()
+        self.faults = faults or Faults()
+        self.lock = threading.Lock()
+        self.cached_prompts = set()
+        self.batches = {}  # Message Batch id -> {'info': batch object, 'results': [(custom_id, result)], 'polls': n}
+
+        self.server = ThreadingHTTPServer((host, port), FakeHandler)
+        self.server.daemon_threads = True
+        self.server.services = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def env(self):
+        """Environment that points every script at these services"""
+        return {
+            'SUPABASE_URL': self.url,
+            'SUPABASE_SERVICE_KEY': 'fake.service.key',
+            'SENDGRID_API_KEY': 'SG.fake',
+            'SENDGRID_API_URL': self.url,
+            'ANTHROPIC_API_KEY': 'fake',
+            'ANTHROPIC_BASE_URL': self.url,
+            'LINKEDIN_ACCESS_TOKEN': 'fake',
+            'LINKEDIN_ORG_ID': '1',
+            'LINKEDIN_API_URL': self.url,
+        }
+
+    def create_batch(self, results):
+        """Register a Message Batch whose results are already known. Returns the batch object"""
+        now = datetime.now(timezone.utc)
+        info = {
+            'id': f'msgbatch_{uuid.uuid4().hex[:24]}',
+            'type': 'message_batch',
+            'processing_status': 'in_progress',
+            'request_counts': {'processing': len(results), 'succeeded': 0, 'errored': 0, 'canceled': 0, 'expired': 0},
+            'created_at': now.isoformat(),
+            'expires_at': (now + timedelta(hours=24)).isoformat(),
+            'ended_at': None,
+            'archived_at': None,
+            'cancel_initiated_at': None,
+            'results_url': None,
+        }
+        with self.lock:
+            self.batches[info['id']] = {'info': info, 'results': results, 'polls': 0}
+        return info
+
+    def poll_batch(self, batch_id):
+        """The batch object for a retrieve: in_progress the first time, ended after that"""
+        with self.lock:
+            batch = self.batches[batch_id]
+            batch['polls'] += 1
+            info = batch['info']
+            if batch['polls'] > 1 and info['processing_status'] != 'ended':
+                succeeded = sum(result['type'] == 'succeeded' for _, result in batch['results'])
+                info.update(processing_status='ended', ended_at=datetime.now(timezone.utc).isoformat(),
+                            results_url=f'{self.url}/v1/messages/batches/{batch_id}/results',
+                            request_counts=dict(info['request_counts'], processing=0, succeeded=succeeded,
+                                                errored=len(batch['results']) - succeeded))
+            return dict(info)
+
+    def cancel_batch(self, batch_id):
+        """End a batch now: requests still processing are canceled and get no result"""
+        with self.lock:
+            batch = self.batches[batch_id]
+            info = batch['info']
+            if info['processing_status'] != 'ended':
+                now = datetime.now(timezone.utc).isoformat()
+                canceled = info['request_counts']['processing']
+                batch['results'] = [(custom_id, {'type': 'canceled'}) for custom_id, _ in batch['results']]
+                info.update(processing_status='ended', cancel_initiated_at=now, ended_at=now,
+                            results_url=f'{self.url}/v1/messages/batches/{batch_id}/results',
+                            request_counts=dict(info['request_counts'], processing=0, canceled=canceled))
+            return dict(info)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_fault_arguments(parser):
+    """--latency-ms/--jitter-ms/--error-rate/--throttle-rate/--fault-services"""
+    parser.add_argument('--latency-ms', type=float, default=0, help='added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='random extra latency, 0..N ms')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests answered with 500')
+    parser.add_argument('--throttle-rate', type=float, default=0, help='fraction of requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with a 429')
+    parser.add_argument('--fault-services', default=','.join(SERVICES),
+                        help=f'comma-separated services the faults apply to (default: {",".join(SERVICES)})')
+    parser.add_argument('--seed', type=int, default=None, help='random seed for repeatable fault patterns')
+
+
+def faults_from_args(args):
+    return Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate,
+                  args.retry_after, args.fault_services.split(','), args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the local stand-in services until Ctrl+C')
+    parser.add_argument('--port', type=int, default=8787)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    services = FakeServices(port=args.port, faults=faults_from_args(args))
+    print(f"🧪 Fake PostgREST / SendGrid / Anthropic (messages + batches) / LinkedIn on {services.url}")
+    for name, value in services.env().items():
+        print(f"export {name}={value}")
+    try:
+        services.server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {json.dumps(services.metrics.snapshot())}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - End-to-End Load Harness
+Runs upload_prospects, prepare_personalization, email_bot, followup_bot and
+social_media_bot as real subprocesses against the local stand-ins in fake_services.py, with N
+synthetic prospects, and reports throughput, per-item latency and peak RSS
+for each.
+Author: Greg Pober
+
+Latency is measured by the fake database: from the moment a row is first
+returned to the bot until the bot writes its status back (for the upload,
+from process start until the row lands).
+
+Usage:
+    python benchmarks/load_harness.py --prospects 2000
+    python benchmarks/load_harness.py --prospects 500 --latency-ms 40 --throttle-rate 0.02 --json load.json
+    python benchmarks/load_harness.py --bots email --profile sample,memory   # profiles land in <workdir>/.metrics
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from fake_services import FakeServices, add_fault_arguments, faults_from_args
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts')
+BOTS = ('upload', 'prepare', 'email', 'followup', 'social')
+
+INDUSTRIES = ['Commercial HVAC', 'Restaurants', 'Construction', 'Property Management', 'Dental Practice',
+              'Manufacturing', 'Law Firm', 'Landscaping', 'Auto Repair', 'Retail', '']
+
+# Unpaced, no on-disk cache, quiet progress - measure the code, not the production pacing
+BOT_ENV = {
+    'SEND_RATE_PER_MINUTE': '0',
+    'FOLLOWUP_RATE_PER_MINUTE': '0',
+    'PERSONALIZATION_CACHE': 'off',
+    'PIPELINE_PROGRESS_SECONDS': '0',
+    'BATCH_POLL_INTERVAL': '0',
+    'PYTHONUNBUFFERED': '1',
+}
+
+
+def write_prospects_csv(path, count, seed):
+    """Synthetic prospects in the upload_prospects.py CSV format"""
+    rng = random.Random(seed)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['email', 'first_name', 'last_name', 'company', 'title',
+                                               'revenue_estimate', 'industry', 'source'])
+        writer.writeheader()
+        for i in range(count):
+            writer.writerow({
+                'email': f'owner{i}@example{i % 97}.com',
+                'first_name': rng.choice(['Jordan', 'Sam', 'Alex', 'Priya', 'Luis', '']),
+                'last_name': 'Tester',
+                'company': f'Example Co {i}',
+                'title': 'Owner',
+                'revenue_estimate': '$2M-$25M',
+                'industry': rng.choice(INDUSTRIES),
+                'source': 'load_test',
+            })
+
+
+def seed_prospects(store, csv_path):
+    """Load the CSV straight into the fake database (when the upload step is skipped)"""
+    with open(csv_path) as f:
+        store.insert('prospects', list(csv.DictReader(f)), on_conflict='email')
+
+
+def age_emailed_prospects(store, days=10):
+    """Move initial sends into the past so every emailed prospect is due a follow-up"""
+    emailed_at = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    with store.lock:
+        rows = list(store.tables['prospects'].values())
+    if not any(row['email_sent'] for row in rows):
+        # email step skipped - pretend they were all emailed
+        for row in rows:
+            row.update(email_sent=True, sequence_step=1)
+    for row in rows:
+        if row['email_sent']:
+            row['email_sent_at'] = emailed_at
+
+
+def seed_posts(store, count):
+    today = date.today().isoformat()
+    store.insert('social_media_posts', [
+        {'post_topic': f'Load test topic {i}: why month-end reporting is too late',
+         'scheduled_date': today, 'scheduled_time': '00:00:00'}
+        for i in range(count)
+    ])
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile, or None for no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+def run_script(script, args, env, workdir, log_name):
+    """Run a script to completion. Returns (exit code, wall seconds, peak RSS in MB)"""
+    with open(os.path.join(workdir, log_name), 'w') as log:
+        started = time.monotonic()
+        process = subprocess.Popen([sys.executable, os.path.join(SCRIPTS_DIR, script)] + args,
+                                   env=env, cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 gives this child's own resource usage (ru_maxrss is KB on Linux)
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.monotonic() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, elapsed, usage.ru_maxrss / 1024
+
+
+def measure(services, bot, script, args, env, workdir, table, count_items):
+    """Run one bot and summarize what the fake services saw"""
+    services.store.reset_marks()
+    before = services.metrics.snapshot()
+    since = time.monotonic()
+
+    code, elapsed, rss_mb = run_script(script, args, env, workdir, f'{bot}.log')
+
+    after = services.metrics.snapshot()
+    latencies = services.store.latencies(table, since)
+    faults = sum(count - before.get(service, {}).get(field, 0)
+                 for service, counts in after.items()
+                 for field, count in counts.items() if field.startswith('http_'))
+    items = count_items(before, after, latencies)
+    return {
+        'bot': bot,
+        'exit_code': code,
+        'seconds': elapsed,
+        'items': items,
+        'per_second': items / elapsed if elapsed else 0.0,
+        'p50_ms': None if not latencies else percentile(latencies, 50) * 1000,
+        'p99_ms': None if not latencies else percentile(latencies, 99) * 1000,
+        'peak_rss_mb': rss_mb,
+        'injected_faults': faults,
+        'log': os.path.join(workdir, f'{bot}.log'),
+    }
+
+
+def delta(service, field):
+    """Counter growth for one fake service across a run"""
+    return lambda before, after, latencies: \
+        after.get(service, {}).get(field, 0) - before.get(service, {}).get(field, 0)
+
+
+def print_report(results, prospects):
+    print("\n" + "=" * 100)
+    print(f"📊 LOAD TEST - {prospects} synthetic prospects")
+    print("=" * 100)
+    print(f"{'bot':<10} {'exit':>4} {'items':>7} {'items/s':>9} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'peak RSS MB':>12} {'faults':>7}  unit")
+    units = {'upload': 'rows', 'prepare': 'prospects', 'email': 'emails', 'followup': 'emails', 'social': 'posts'}
+    for r in results:
+        p50 = '-' if r['p50_ms'] is None else f"{r['p50_ms']:.0f}"
+        p99 = '-' if r['p99_ms'] is None else f"{r['p99_ms']:.0f}"
+        print(f"{r['bot']:<10} {r['exit_code']:>4} {r['items']:>7} {r['per_second']:>9.1f} {p50:>9} {p99:>9} "
+              f"{r['peak_rss_mb']:>12.1f} {r['injected_faults']:>7}  {units[r['bot']]}")
+    print(f"\nBot output: {os.path.dirname(results[0]['log'])}" if results else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the bots end to end against local fake services')
+    parser.add_argument('--prospects', type=int, default=1000, help='synthetic prospects to upload and email')
+    parser.add_argument('--posts', type=int, default=10, help='social posts scheduled for today')
+    parser.add_argument('--bots', default=','.join(BOTS), help=f'comma-separated subset of {",".join(BOTS)}')
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--profile', help='PROFILE modes for every bot (cpu, sample, memory, all)')
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+    bots = args.bots.split(',')
+
+    workdir = tempfile.mkdtemp(prefix='iamcfo-load-')
+    csv_path = os.path.join(workdir, 'prospects.csv')
+    write_prospects_csv(csv_path, args.prospects, args.seed)
+
+    results = []
+    with FakeServices(faults=faults_from_args(args)) as services:
+        env = dict(os.environ, **services.env(), **BOT_ENV)
+        if args.profile:
+            env['PROFILE'] = args.profile
+        print(f"🧪 Fake services on {services.url}, working directory {workdir}")
+
+        if 'upload' in bots:
+            print("📁 upload_prospects...")
+            results.append(measure(services, 'upload', 'upload_prospects.py', [csv_path], env, workdir,
+                                   'prospects', lambda before, after, latencies: len(latencies)))
+        else:
+            seed_prospects(services.store, csv_path)
+
+        if 'prepare' in bots:
+            print("🌙 prepare_personalization...")
+            results.append(measure(services, 'prepare', 'prepare_personalization.py', [],
+                                   dict(env, BATCH_SIZE=str(args.prospects)), workdir, 'prospects',
+                                   lambda before, after, latencies: len(latencies)))
+
+        if 'email' in bots:
+            print("📧 email_bot...")
+            results.append(measure(services, 'email', 'email_bot.py', [], dict(env, BATCH_SIZE=str(args.prospects)),
+                                   workdir, 'prospects', delta('sendgrid', 'emails')))
+
+        if 'followup' in bots:
+            age_emailed_prospects(services.store)
+            print("🔄 followup_bot...")
+            results.append(measure(services, 'followup', 'followup_bot.py', [], env, workdir,
+                                   'prospects', delta('sendgrid', 'emails')))
+
+        if 'social' in bots:
+            seed_posts(services.store, args.posts)
+            print("🤖 social_media_bot...")
+            results.append(measure(services, 'social', 'social_media_bot.py', [], env, workdir,
+                                   'social_media_posts', delta('linkedin', 'posts')))
+
+    print_report(results, args.prospects)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'prospects': args.prospects, 'faults': vars(args), 'results': results}, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+    return 0 if all(r['exit_code'] == 0 for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
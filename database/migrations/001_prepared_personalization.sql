@@ -0,0 +1,8 @@
+-- Overnight personalization (scripts/prepare_personalization.py)
+-- Run this in the Supabase SQL Editor.
+-- The Message Batch run stores each prospect's personalized email here and
+-- email_bot.py sends it as-is instead of calling Claude at send time.
+
+ALTER TABLE prospects ADD COLUMN IF NOT EXISTS personalized_subject TEXT;
+ALTER TABLE prospects ADD COLUMN IF NOT EXISTS personalized_html TEXT;
+ALTER TABLE prospects ADD COLUMN IF NOT EXISTS personalized_at TIMESTAMP WITH TIME ZONE;
@@ -0,0 +1,35 @@
+-- Personalization cache (scripts/personalization_cache.py, PERSONALIZATION_CACHE=supabase)
+-- Run this in the Supabase SQL Editor.
+-- Values are zlib-compressed JSON ({subject, html}), base64 encoded.
+
+CREATE TABLE IF NOT EXISTS personalization_cache (
+  key TEXT PRIMARY KEY, -- sha256(prompt version + prompt-relevant prospect fields)
+  value TEXT NOT NULL,
+  size_bytes INTEGER NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_personalization_cache_created_at ON personalization_cache(created_at);
+
+ALTER TABLE personalization_cache ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow all for service role" ON personalization_cache
+  FOR ALL USING (auth.role() = 'service_role');
+
+-- Drop expired entries, then the oldest ones until the table fits in max_bytes
+CREATE OR REPLACE FUNCTION evict_personalization_cache(ttl_seconds INTEGER, max_bytes BIGINT)
+RETURNS void AS $$
+BEGIN
+  DELETE FROM personalization_cache
+  WHERE created_at < now() - make_interval(secs => ttl_seconds);
+
+  DELETE FROM personalization_cache
+  WHERE key IN (
+    SELECT key FROM (
+      SELECT key, SUM(size_bytes) OVER (ORDER BY created_at DESC, key) AS running_bytes
+      FROM personalization_cache
+    ) sized
+    WHERE running_bytes > max_bytes
+  );
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,33 @@
+-- Bulk status writes (scripts/ack_buffer.py)
+-- Run this in the Supabase SQL Editor.
+-- The bots buffer "sent" acknowledgements and record a whole chunk with one
+-- RPC call instead of one UPDATE per email. Arrays are matched by position.
+
+-- Initial email sent: enter the follow-up sequence at step 1
+CREATE OR REPLACE FUNCTION mark_prospects_emailed(p_ids UUID[], p_sent_at TIMESTAMP WITH TIME ZONE[])
+RETURNS INTEGER AS $$
+  WITH updated AS (
+    UPDATE prospects p
+    SET email_sent = true,
+        email_sent_at = acks.sent_at,
+        sequence_step = 1
+    FROM unnest(p_ids, p_sent_at) AS acks(id, sent_at)
+    WHERE p.id = acks.id
+    RETURNING 1
+  )
+  SELECT count(*)::INTEGER FROM updated;
+$$ LANGUAGE sql;
+
+-- Follow-up sent: move each prospect to its next sequence step
+CREATE OR REPLACE FUNCTION advance_prospects_followup(p_ids UUID[], p_next_steps INTEGER[], p_followup_at TIMESTAMP WITH TIME ZONE[])
+RETURNS INTEGER AS $$
+  WITH updated AS (
+    UPDATE prospects p
+    SET sequence_step = acks.next_step,
+        last_followup_at = acks.followup_at
+    FROM unnest(p_ids, p_next_steps, p_followup_at) AS acks(id, next_step, followup_at)
+    WHERE p.id = acks.id
+    RETURNING 1
+  )
+  SELECT count(*)::INTEGER FROM updated;
+$$ LANGUAGE sql;
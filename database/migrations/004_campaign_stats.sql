@@ -0,0 +1,18 @@
+-- Campaign statistics (scripts/campaign_stats.py)
+-- Run this in the Supabase SQL Editor.
+-- Returns every count the bots print in one aggregate query, instead of
+-- the bots pulling the whole prospects table to count it.
+
+CREATE OR REPLACE FUNCTION get_campaign_stats()
+RETURNS JSON AS $$
+  SELECT json_build_object(
+    'total', count(*),
+    'sent', count(*) FILTER (WHERE email_sent),
+    'replied', count(*) FILTER (WHERE replied),
+    'step_1', count(*) FILTER (WHERE sequence_step = 1),
+    'step_2', count(*) FILTER (WHERE sequence_step = 2),
+    'step_3', count(*) FILTER (WHERE sequence_step = 3),
+    'step_4', count(*) FILTER (WHERE sequence_step = 4)
+  )
+  FROM prospects;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,7 @@
+-- Prospect content hashes (scripts/prospect_sync.py, PROSPECT_HASHES=supabase)
+-- Run this in the Supabase SQL Editor.
+-- upload_prospects.py --sync stores a hash of each uploaded row's normalized
+-- fields here and skips rows whose hash hasn't changed on the next upload.
+-- Rows uploaded before this column existed are sent (and hashed) once more.
+
+ALTER TABLE prospects ADD COLUMN IF NOT EXISTS content_hash TEXT;
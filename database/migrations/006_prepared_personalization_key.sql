@@ -0,0 +1,9 @@
+-- Prepared personalization key (scripts/prepare_personalization.py)
+-- Run this in the Supabase SQL Editor.
+-- The overnight run stores the personalization cache key (prompt version +
+-- the prospect fields the prompt uses) next to each prepared email.
+-- email_bot.py only sends the prepared email while the key still matches, so
+-- a PROMPT_VERSION bump or a re-upload that changes a prospect's name,
+-- company or industry gets a fresh email instead of a stale one.
+
+ALTER TABLE prospects ADD COLUMN IF NOT EXISTS personalized_key TEXT;
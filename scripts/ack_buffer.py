@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Buffered Status Writes
+Collects "this prospect was sent" acknowledgements and writes them to
+Supabase in chunks (one RPC per chunk) instead of one UPDATE per email.
+A chunk is flushed when it reaches ACK_FLUSH_SIZE entries, when its oldest
+entry is ACK_FLUSH_SECONDS old, and once more on shutdown.
+Author: Greg Pober
+
+Usage:
+    with AckBuffer('email', flush_chunk, write_one) as acks:
+        acks.add({'id': ..., 'sent_at': ...})
+"""
+
+import os
+import threading
+import time
+
+ACK_FLUSH_SIZE = int(os.getenv('ACK_FLUSH_SIZE', 100))
+ACK_FLUSH_SECONDS = float(os.getenv('ACK_FLUSH_SECONDS', 10))
+
+
+class AckBuffer:
+    """
+    Thread-safe acknowledgement buffer
+
+    flush_chunk(entries) writes a whole chunk in one round trip. If it fails,
+    write_one(entry) is tried per entry so a bad chunk doesn't lose the rest
+    (an unrecorded prospect would be emailed again on the next run).
+    """
+
+    def __init__(self, name, flush_chunk, write_one=None,
+                 max_items=ACK_FLUSH_SIZE, max_age=ACK_FLUSH_SECONDS):
+        self.name = name
+        self.flush_chunk = flush_chunk
+        self.write_one = write_one
+        self.max_items = max_items
+        self.max_age = max_age
+
+        # Counters
+        self.recorded = 0
+        self.failed = 0
+        self.round_trips = 0
+
+        self._entries = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer = threading.Thread(target=self._flush_when_stale, name=f"{name}-acks", daemon=True)
+        self._timer.start()
+
+    def add(self, entry):
+        """Buffer one acknowledgement, flushing if the chunk is full"""
+        with self._lock:
+            if not self._entries:
+                self._oldest = time.monotonic()
+            self._entries.append(entry)
+            full = len(self._entries) >= self.max_items
+
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write everything buffered so far"""
+        with self._flush_lock:
+            with self._lock:
+                entries, self._entries = self._entries, []
+                self._oldest = None
+            if not entries:
+                return
+
+            try:
+                self.round_trips += 1
+                self.flush_chunk(entries)
+                self.recorded += len(entries)
+                return
+            except Exception as e:
+                print(f"⚠️ Bulk status write for {len(entries)} {self.name} prospects failed: {e}")
+
+            for entry in entries:
+                try:
+                    if self.write_one is None:
+                        raise RuntimeError("no per-row fallback")
+                    self.round_trips += 1
+                    self.write_one(entry)
+                    self.recorded += 1
+                except Exception as e:
+                    print(f"❌ {entry.get('email', entry.get('id'))} was sent but not recorded: {e}")
+                    self.failed += 1
+
+    def _flush_when_stale(self):
+        while not self._closed.wait(min(1.0, self.max_age)):
+            with self._lock:
+                stale = self._oldest is not None and time.monotonic() - self._oldest >= self.max_age
+            if stale:
+                self.flush()
+
+    def close(self):
+        """Stop the timer and write whatever is left"""
+        self._closed.set()
+        self.flush()
+
+    def report(self):
+        """Print how many DB round trips the status writes took"""
+        print(f"   Status writes: {self.recorded} prospects in {self.round_trips} DB round trips"
+              + (f", {self.failed} failed" if self.failed else ""))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Campaign Statistics
+Prospect counts for the bots' progress reports, without downloading rows.
+Uses the get_campaign_stats RPC (one aggregate query) and falls back to
+count-only requests if the RPC isn't installed.
+Author: Greg Pober
+"""
+
+from iamcfo import metrics
+
+# sequence_step values: 1 = initial email sent, 2-4 = follow-up #1-#3 sent
+SEQUENCE_STEPS = (1, 2, 3, 4)
+
+
+def _count(supabase, **filters):
+    """Row count for prospects matching filters (exact count, at most one id transferred)"""
+    # head=True would skip the row entirely, but postgrest-py then reads the
+    # empty body as a failed response and reports count 0
+    query = supabase.table('prospects').select('id', count='exact').limit(1)
+    for column, value in filters.items():
+        query = query.eq(column, value)
+    return query.execute().count or 0
+
+
+def _count_separately(supabase):
+    """Same numbers as the RPC, one count-only request per figure"""
+    stats = {
+        'total': _count(supabase),
+        'sent': _count(supabase, email_sent=True),
+        'replied': _count(supabase, replied=True),
+    }
+    for step in SEQUENCE_STEPS:
+        stats[f'step_{step}'] = _count(supabase, sequence_step=step)
+    return stats
+
+
+def get_campaign_stats(supabase):
+    """
+    Get campaign counts
+
+    Returns:
+        {'total', 'sent', 'replied', 'remaining', 'step_1' .. 'step_4'}
+    """
+    with metrics.timer('stats'):
+        try:
+            stats = dict(supabase.rpc('get_campaign_stats').execute().data)
+        except Exception as e:
+            print(f"⚠️ get_campaign_stats RPC unavailable ({e}), counting separately")
+            stats = _count_separately(supabase)
+
+    stats['remaining'] = stats['total'] - stats['sent']
+    return stats
+
+
+def print_sequence_stats(stats):
+    """Print where prospects are in the email sequence"""
+    print(f"  📊 Total prospects: {stats['total']}")
+    print(f"  ✅ Emailed: {stats['sent']} (replied: {stats['replied']})")
+    print(f"  📧 Initial only: {stats['step_1']} | After follow-up #1: {stats['step_2']} | "
+          f"#2: {stats['step_3']} | #3: {stats['step_4']}")
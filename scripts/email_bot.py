@@ -7,45 +7,24 @@ Author: Greg Pober
 """
 
 import os
-import sys
-import time
+import itertools
 from datetime import datetime
-from supabase import create_client, Client
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, TrackingSettings, ClickTracking, OpenTracking
-import anthropic
-
-# Initialize clients
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
-SENDGRID_API_KEY = os.getenv('SENDGRID_API_KEY')
-ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
-
-# Validate environment variables
-if not SUPABASE_URL:
-    print("❌ ERROR: SUPABASE_URL environment variable is not set!")
-    print("   Check your GitHub secrets at:")
-    print("   https://github.com/gpober/iamcfo-marketing-automation/settings/secrets/actions")
-    sys.exit(1)
-
-if not SUPABASE_SERVICE_KEY:
-    print("❌ ERROR: SUPABASE_SERVICE_KEY environment variable is not set!")
-    sys.exit(1)
-
-if not SENDGRID_API_KEY:
-    print("❌ ERROR: SENDGRID_API_KEY environment variable is not set!")
-    sys.exit(1)
-
-if not ANTHROPIC_API_KEY:
-    print("❌ ERROR: ANTHROPIC_API_KEY environment variable is not set!")
-    sys.exit(1)
-
-print(f"✅ SUPABASE_URL: {SUPABASE_URL}")
-print(f"✅ Environment variables loaded successfully")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-sendgrid = SendGridAPIClient(SENDGRID_API_KEY)
-claude = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+from iamcfo import clients, config, metrics, profiling, transport
+from pipeline import Pipeline, Stage
+from rate_limiter import RateLimiter
+from ack_buffer import AckBuffer
+from campaign_stats import get_campaign_stats
+import personalization_cache
+from prompt_cache import cached_system, PromptCacheStats
+from email_templates import (
+    EMAIL_SUBJECT_1, EMAIL_HTML_1, INDUSTRY_PAIN_POINTS, INITIAL_EMAIL, FALLBACK_EMAILS,
+    PAIN_POINT_INDEX
+)
+
+# Clients are created on first use (iamcfo.clients) - a run with nothing to
+# send never imports SendGrid or Anthropic
+REQUIRED_ENV = (config.SUPABASE_URL, config.SUPABASE_SERVICE_KEY, config.SENDGRID_API_KEY, config.ANTHROPIC_API_KEY)
+prompt_cache_stats = PromptCacheStats()
 
 BATCH_SIZE = int(os.getenv('BATCH_SIZE', 500))  # Increased for upgraded plan
 SENDER_EMAIL = 'gpober@iamcfo.com'
@@ -54,53 +33,31 @@ SENDER_NAME = 'Greg Pober - I AM CFO'
 # Daily send limit tracking (50K/month = ~1,600/day)
 DAILY_SEND_LIMIT = 500  # Conservative limit (can go higher if needed)
 
-# ============================================================================
-# EMAIL TEMPLATE - Daily Cash Flow Pain Points (HTML with UTM tracking)
-# ============================================================================
-
-EMAIL_SUBJECT_1 = "Can you afford to hire that new person?"
-EMAIL_HTML_1 = """<html>
-<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
-
-<p>{first_name},</p>
-
-<p>You're looking at the bank balance.<br>
-You're looking at the bills due.<br>
-You're trying to do the math in your head.</p>
-
-<p>"Can I afford this hire?"<br>
-"Should I wait another month?"<br>
-"What if that big invoice doesn't come in?"</p>
-
-<p>Every business owner asks these questions.<br>
-But most are flying blind with spreadsheets and guesswork.</p>
-
-<p><strong>I AM CFO shows you the answer in real-time:</strong></p>
-
-<p>✅ Today's actual cash position (not last month's)<br>
-✅ Your burn rate this week (see where money's going)<br>
-✅ Cash flow forecast (know what's coming in and out)<br>
-✅ Profit by location, service, or product (know what's working)</p>
-
-<p>One {industry} company used I AM CFO to discover they had $47K more cash available than they thought. They made the hire. Best decision they made.</p>
+# Prospect fetch: pages of FETCH_PAGE_SIZE, ordered by id
+FETCH_PAGE_SIZE = int(os.getenv('FETCH_PAGE_SIZE', 100))
 
-<p>Another found they were losing $3K/month on their most popular service. Adjusted pricing. Turned it around in 30 days.</p>
+# Only the columns personalization and sending read
+PROSPECT_COLUMNS = 'id,email,first_name,company,title,revenue_estimate,industry'
+# Written by prepare_personalization.py, added by database/migrations/001 and 006
+PREPARED_COLUMNS = 'personalized_subject,personalized_html,personalized_key'
 
-<p><strong>Real-time cash flow visibility = Better decisions.</strong></p>
+# Send pipeline: personalization runs ahead of sending, sends are paced to a target rate.
+# Always on - it replaced the ASYNC_SEND asyncio mode, so ASYNC_SEND is no longer read.
+SEND_CONCURRENCY = int(os.getenv('SEND_CONCURRENCY', 10))  # Workers for the personalize and send stages
+SEND_RATE_PER_MINUTE = float(os.getenv('SEND_RATE_PER_MINUTE', 60))  # Pacing target (0 = unpaced)
 
-<p>👉 See your real-time cash flow: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+# Bump whenever the prompts or templates change so cached personalizations are regenerated
+PROMPT_VERSION = '2'
 
-<p>Worth 15 minutes to stop guessing?</p>
+# Prospect fields that feed the Claude prompt (email goes into the tracking link)
+PROMPT_FIELDS = ('first_name', 'company', 'title', 'revenue_estimate', 'industry', 'email')
 
-<p>— <br>
-Greg Pober<br>
-CEO | I AM CFO<br>
-<a href="mailto:gpober@iamcfo.com">gpober@iamcfo.com</a> • 954-684-9011</p>
 
-<p style="font-size: 14px; color: #666;"><strong>P.S.</strong> Connects to your QuickBooks/Xero Accounting Software. Set up within 24 hours. See your real cash position today.</p>
-
-</body>
-</html>"""
+@clients.lazy
+def personalization_store():
+    """Personalization cache backend selected by PERSONALIZATION_CACHE, opened on first use"""
+    needs_db = personalization_cache.PERSONALIZATION_CACHE == 'supabase'
+    return personalization_cache.open_cache(clients.supabase() if needs_db else None)
 
 
 def generate_tracking_link(campaign, source, medium, content, industry=None):
@@ -137,171 +94,47 @@ def generate_tracking_link(campaign, source, medium, content, industry=None):
     return f"{base_url}?{query_string}"
 
 
-# Alternative subject lines for A/B testing
-SUBJECT_LINES = [
-    "Can you afford to hire that new person?",
-    "What's your real cash position today?",
-    "Stop guessing about your cash flow",
-    "You're making million-dollar decisions with month-old data",
-    "How much cash can you actually spend this month?",
-    "The question every business owner asks daily",
-    "Why is cash always tighter than expected?",
-]
-
-
-# ============================================================================
-# INDUSTRY-SPECIFIC PAIN POINTS - Daily Cash Flow Struggles
-# ============================================================================
-
-INDUSTRY_PAIN_POINTS = {
-    'construction': {
-        'subject': "How much can you bid on that new job?",
-        'opening': "You've got a bid request. You need to decide: What can you afford to commit to?",
-        'pain': "Material costs are up. Labor's tight. You've got 3 jobs running and 2 more starting next month.",
-        'question': "Can you afford to take this job without stretching cash too thin?",
-        'solution': "I AM CFO shows you real-time cash flow by job. You'll know exactly what you can bid without putting the business at risk.",
-        'example': "A GC in Florida used I AM CFO to see they had $85K more available than expected. Bid on a $400K job. Won it. Profitable."
-    },
-    'restaurant': {
-        'subject': "Why does cash feel tighter than sales suggest?",
-        'opening': "Sales are up. But somehow, cash is still tight. What's going on?",
-        'pain': "Food costs fluctuate. Labor scheduling is a puzzle. Some locations feel more profitable than others, but which ones?",
-        'question': "Where is your cash actually going?",
-        'solution': "I AM CFO shows real-time P&L by location and tracks your actual food cost percentage daily.",
-        'example': "A 3-location restaurant group discovered one location was bleeding $4K/month. Fixed vendor pricing. Turned profitable in 6 weeks."
-    },
-    'property management': {
-        'subject': "Which properties are actually making you money?",
-        'opening': "You've got 8 properties. Some feel profitable. Some don't. But which ones actually are?",
-        'pain': "Maintenance costs spike unexpectedly. Vacancy rates change. Some properties just seem to eat cash.",
-        'question': "Can you see profit by property in real-time?",
-        'solution': "I AM CFO gives you real-time profitability by property. You'll know exactly which ones are winners and which need attention.",
-        'example': "A PM company found 2 of their 12 properties were breakeven or worse. Raised rents on one, sold the other. Added $6K/month profit."
-    },
-    'hvac': {
-        'subject': "Can you afford that new truck?",
-        'opening': "Your truck has 180K miles. You need to replace it. But can you afford it right now?",
-        'pain': "Jobs are booked out 3 weeks. Revenue looks good on paper. But cash? That's harder to see.",
-        'question': "What's your real cash position today?",
-        'solution': "I AM CFO shows today's cash, this week's burn rate, and projects your cash flow for the next 90 days.",
-        'example': "An HVAC company saw they had $65K available. Bought 2 trucks. Took on more jobs. Grew 40% in 6 months."
-    },
-    'professional services': {
-        'subject': "Are you actually making money on that client?",
-        'opening': "You've got a big client. Lots of hours. But are you actually profitable on them?",
-        'pain': "Some clients take way more time than others. Scope creep happens. You bill hours but don't track true profitability.",
-        'question': "Which clients are making you money and which are costing you?",
-        'solution': "I AM CFO tracks profitability by client and project in real-time. You'll know exactly who's worth the effort.",
-        'example': "A consulting firm found their 3rd biggest client was their least profitable. Raised rates. Client said yes. Added $5K/month margin."
-    },
-    'automotive': {
-        'subject': "Why does cash disappear faster than expected?",
-        'opening': "Parts are expensive. Labor costs are up. Sales look good. But cash always feels tight.",
-        'pain': "You're juggling parts inventory, labor scheduling, and customer payments. Cash flow is a daily puzzle.",
-        'question': "Where is your cash actually going?",
-        'solution': "I AM CFO shows real-time cash flow with daily burn rate, accounts payable coming due, and receivables coming in.",
-        'example': "An auto shop discovered they were sitting on $35K in parts inventory they didn't need. Liquidated it. Freed up cash."
-    },
-    'manufacturing': {
-        'subject': "Can you afford that equipment upgrade?",
-        'opening': "You need new equipment. It would help production. But can you afford it without stretching too thin?",
-        'pain': "Material costs change. Production schedules shift. Some products are more profitable than others, but which?",
-        'question': "What's your real cash position and burn rate?",
-        'solution': "I AM CFO gives you real-time cash flow with 90-day projections so you can make big decisions with confidence.",
-        'example': "A manufacturer saw they had $120K available. Bought new equipment. Increased capacity 30%. ROI in 8 months."
-    },
-    'healthcare': {
-        'subject': "When will that insurance payment actually hit?",
-        'opening': "You've got receivables out there. Some insurance. Some patient pay. But when does cash actually come in?",
-        'pain': "Insurance delays. Patient payment plans. Revenue is complicated to track and cash flow even more so.",
-        'question': "What's your real cash position today?",
-        'solution': "I AM CFO tracks cash flow in real-time and projects when receivables will actually convert to cash.",
-        'example': "A medical practice saw they had $45K in receivables over 90 days. Focused collections. Brought in $38K in 30 days."
-    },
-}
+def get_industry_key(industry):
+    """Get the INDUSTRY_PAIN_POINTS key matching a prospect's industry (longest match wins)"""
+    return PAIN_POINT_INDEX.match(industry)
 
 
 def get_industry_template(industry):
     """Get industry-specific email template"""
-    if not industry:
-        return None
-    
-    industry_lower = industry.lower()
-    
-    for key, template in INDUSTRY_PAIN_POINTS.items():
-        if key in industry_lower:
-            return template
-    
-    return None
+    key = get_industry_key(industry)
+    return INDUSTRY_PAIN_POINTS[key] if key else None
 
 
-def get_prospects_to_email(batch_size=100):
-    """Get next batch of prospects who haven't been emailed"""
-    try:
-        response = supabase.table('prospects')\
-            .select('*')\
-            .eq('email_sent', False)\
-            .limit(batch_size)\
-            .execute()
-        
-        return response.data
-    except Exception as e:
-        print(f"❌ Error fetching prospects: {e}")
-        return []
+# ============================================================================
+# CLAUDE PROMPT - static part is sent as a cached system prompt, only the
+# prospect details change per request
+# ============================================================================
 
+def build_system_prompt():
+    """Everything in the personalization prompt that is the same for every prospect"""
+    pain_points = '\n\n'.join(
+        f"""[{key}]
+Subject: {template['subject']}
+Opening: {template['opening']}
+Pain: {template['pain']}
+Question: {template['question']}
+Solution: {template['solution']}
+Example: {template['example']}"""
+        for key, template in INDUSTRY_PAIN_POINTS.items()
+    )
+    
+    return f"""You personalize emails for I AM CFO, sent to business owners who struggle with daily cash flow decisions.
 
-def personalize_with_claude(prospect):
-    """Use Claude to personalize the email based on prospect data and daily pain points"""
-    try:
-        # Get prospect info - FIXED: Handle None values properly
-        first_name = (prospect.get('first_name') or '').strip()
-        company = prospect.get('company', 'your company')
-        revenue = prospect.get('revenue_estimate', '$2M-$25M')
-        title = prospect.get('title', 'business owner')
-        industry = prospect.get('industry', '')
-        prospect_email = prospect.get('email', '')
-        
-        # Determine greeting - use company name if no first name
-        if not first_name:
-            greeting = f"At {company}"
-            greeting_context = f"Address them as 'At {company}' since we don't have their first name. Example: 'At {company}, you're probably looking at...'"
-        else:
-            greeting = first_name
-            greeting_context = f"Use their first name: {first_name}"
-        
-        # Generate tracking link
-        tracking_link = generate_tracking_link(
-            campaign='initial_outreach',
-            source='email',
-            medium='campaign',
-            content=prospect_email,
-            industry=industry
-        )
-        
-        # Try to get industry-specific template
-        industry_template = get_industry_template(industry)
-        
-        if industry_template:
-            # Use industry-specific pain point
-            prompt = f"""Personalize this email for a business owner who struggles with daily cash flow decisions.
+Each request gives you the prospect info, the greeting to use and which template to follow: INDUSTRY (with an industry key) or GENERIC.
 
-Prospect info:
-- Company: {company}
-- Title: {title}
-- Revenue: {revenue}
-- Industry: {industry}
-- Greeting: {greeting_context}
+=== INDUSTRY TEMPLATE ===
+
+Industry-specific pain points:
 
-Industry-specific pain point:
-Subject: {industry_template['subject']}
-Opening: {industry_template['opening']}
-Pain: {industry_template['pain']}
-Question: {industry_template['question']}
-Solution: {industry_template['solution']}
-Example: {industry_template['example']}
+{pain_points}
 
 Instructions:
-1. {greeting_context}
+1. Use the greeting given in the request
 2. Start with the industry-specific pain point (it's relatable and real)
 3. Make it feel like you understand THEIR specific daily struggle
 4. Show how I AM CFO solves this with real-time cash flow visibility
@@ -313,164 +146,334 @@ Instructions:
 10. Keep under 200 words
 11. Format as HTML email body (use <p> tags, <br>, <strong>, etc.)
 12. DO NOT include subject line in the output
-13. Link should be formatted as: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a>
-
-HTML email body:"""
-        else:
-            # Use generic cash flow pain template
-            prompt = f"""Personalize this HTML email for a business owner who struggles with daily cash flow decisions.
+13. Link should be formatted as: <a href="{{tracking_link}}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a>
 
-Prospect info:
-- Company: {company}
-- Title: {title}
-- Revenue: {revenue}
-- Industry: {industry if industry else 'small business'}
-- Greeting: {greeting_context}
+=== GENERIC TEMPLATE ===
 
 Base HTML template (personalize this):
 {EMAIL_HTML_1}
 
 Instructions:
-1. {greeting_context}
+1. Use the greeting given in the request
 2. Focus on the daily pain: "Can I afford this?" decisions
 3. Emphasize real-time cash flow visibility (that's what we solve)
 4. Make it relatable - every business owner asks these questions
 5. Show concrete value: know your cash position TODAY, not last month
-6. Use {industry if industry else 'business'} for the example
+6. Use the prospect's industry (or 'business' if none) for the example
 7. Keep it empathetic and helpful (NOT critical or salesy)
 8. Tone: Understanding advisor, not pushy salesperson
 9. Keep under 200 words
 10. Return ONLY the HTML email body (no subject line)
-11. Link must be: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a>
+11. Link must be: <a href="{{tracking_link}}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a>
 
-HTML email body:"""
-        
-        message = claude.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1024,
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }]
-        )
-        
-        personalized_html = message.content[0].text.strip()
-        
-        # Use industry-specific subject if available, otherwise default
-        if industry_template:
-            subject = industry_template['subject']
-        else:
-            subject = EMAIL_SUBJECT_1
-        
-        # Format the HTML body with tracking link and greeting
-        personalized_html = personalized_html.format(
-            first_name=greeting,
-            industry=industry if industry else 'business',
-            tracking_link=tracking_link
-        )
-        
-        return subject, personalized_html
-        
-    except Exception as e:
-        print(f"⚠️ Claude personalization failed for {prospect['email']}: {e}")
-        
-        # Fallback to basic template - FIXED: Handle None values properly
-        first_name = (prospect.get('first_name') or '').strip()
-        company = prospect.get('company', 'your company')
-        industry = prospect.get('industry', 'business')
-        prospect_email = prospect.get('email', '')
-        
-        # Use company name if no first name
-        if not first_name:
-            greeting = f"At {company}"
-        else:
-            greeting = first_name
-        
-        # Generate tracking link
-        tracking_link = generate_tracking_link(
-            campaign='initial_outreach',
-            source='email',
-            medium='campaign',
-            content=prospect_email,
-            industry=industry
-        )
+Write {{tracking_link}} literally - the real link is filled in after you answer."""
+
+
+PERSONALIZATION_SYSTEM_PROMPT = build_system_prompt()
+
+
+def iter_prospects_to_email(batch_size=100, page_size=FETCH_PAGE_SIZE):
+    """
+    Yield up to batch_size prospects who haven't been emailed, in id order
+    
+    Pages with an id keyset cursor (id > last id seen) rather than an offset,
+    so rows marked sent while the run is going don't shift later pages. A
+    rerun after a crash needs no cursor: everything acknowledged is
+    email_sent and filtered out.
+    """
+    fetched = 0
+    after_id = None
+    columns = f'{PROSPECT_COLUMNS},{PREPARED_COLUMNS}'
+    
+    while fetched < batch_size:
+        limit = min(page_size, batch_size - fetched)
+        try:
+            query = clients.supabase().table('prospects')\
+                .select(columns)\
+                .eq('email_sent', False)
+            if after_id:
+                query = query.gt('id', after_id)
+            with metrics.timer('fetch') as timer:
+                page = query.order('id').limit(limit).execute().data
+                timer.items = len(page)
+        except Exception as e:
+            if columns != PROSPECT_COLUMNS:
+                # Migration 001/006 not applied - personalize everyone live instead
+                print(f"⚠️ Prepared personalization columns unavailable ({e}), fetching without them")
+                columns = PROSPECT_COLUMNS
+                continue
+            print(f"❌ Error fetching prospects: {e}")
+            return
         
-        industry_template = get_industry_template(industry)
+        yield from page
         
-        if industry_template:
-            subject = industry_template['subject']
-            html_body = f"""<html>
-<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+        fetched += len(page)
+        if len(page) < limit:
+            return
+        after_id = page[-1]['id']
+
+
+def get_prospects_to_email(batch_size=100):
+    """Get next batch of prospects who haven't been emailed"""
+    return list(iter_prospects_to_email(batch_size))
+
+
+def build_personalization_request(prospect):
+    """
+    Build the Claude request for a prospect
+    
+    Returns:
+        (request_params, subject, format_values) - request_params goes straight to
+        claude.messages.create (or into a Message Batch), format_values fills the
+        placeholders left in Claude's output
+    """
+    # Get prospect info - FIXED: Handle None values properly
+    first_name = (prospect.get('first_name') or '').strip()
+    company = prospect.get('company', 'your company')
+    revenue = prospect.get('revenue_estimate', '$2M-$25M')
+    title = prospect.get('title', 'business owner')
+    industry = prospect.get('industry', '')
+    prospect_email = prospect.get('email', '')
+    
+    # Determine greeting - use company name if no first name
+    if not first_name:
+        greeting = f"At {company}"
+        greeting_context = f"Address them as 'At {company}' since we don't have their first name. Example: 'At {company}, you're probably looking at...'"
+    else:
+        greeting = first_name
+        greeting_context = f"Use their first name: {first_name}"
+    
+    # Generate tracking link
+    tracking_link = generate_tracking_link(
+        campaign='initial_outreach',
+        source='email',
+        medium='campaign',
+        content=prospect_email,
+        industry=industry
+    )
+    
+    # Try to get industry-specific template
+    industry_key = get_industry_key(industry)
+    industry_template = INDUSTRY_PAIN_POINTS[industry_key] if industry_key else None
+    
+    if industry_template:
+        # Use industry-specific pain point
+        template_choice = f"INDUSTRY ({industry_key})"
+    else:
+        # Use generic cash flow pain template
+        template_choice = "GENERIC"
+    
+    prompt = f"""Template: {template_choice}
 
-<p>{greeting},</p>
+Prospect info:
+- Company: {company}
+- Title: {title}
+- Revenue: {revenue}
+- Industry: {industry if industry else 'small business'}
+- Greeting: {greeting_context}
 
-<p>{industry_template['opening']}</p>
+HTML email body:"""
+    
+    request_params = {
+        "model": "claude-sonnet-4-20250514",
+        "max_tokens": 1024,
+        "system": cached_system(PERSONALIZATION_SYSTEM_PROMPT),
+        "messages": [{
+            "role": "user",
+            "content": prompt
+        }]
+    }
+    
+    # Use industry-specific subject if available, otherwise default
+    if industry_template:
+        subject = industry_template['subject']
+    else:
+        subject = EMAIL_SUBJECT_1
+    
+    format_values = {
+        'first_name': greeting,
+        'industry': industry if industry else 'business',
+        'tracking_link': tracking_link
+    }
+    
+    return request_params, subject, format_values
 
-<p>{industry_template['pain']}</p>
 
-<p><strong>{industry_template['question']}</strong></p>
+@metrics.timed('render')
+def finish_personalization(claude_text, format_values):
+    """Format Claude's HTML body with tracking link and greeting"""
+    return claude_text.strip().format(**format_values)
 
-<p>{industry_template['solution']}</p>
 
-<p>{industry_template['example']}</p>
+@metrics.timed('render')
+def fallback_personalization(prospect):
+    """Basic template used when Claude is unavailable"""
+    # FIXED: Handle None values properly
+    first_name = (prospect.get('first_name') or '').strip()
+    company = prospect.get('company', 'your company')
+    industry = prospect.get('industry', 'business')
+    prospect_email = prospect.get('email', '')
+    
+    # Use company name if no first name
+    if not first_name:
+        greeting = f"At {company}"
+    else:
+        greeting = first_name
+    
+    # Generate tracking link
+    tracking_link = generate_tracking_link(
+        campaign='initial_outreach',
+        source='email',
+        medium='campaign',
+        content=prospect_email,
+        industry=industry
+    )
+    
+    # Pre-compiled templates (email_templates.py) - industry pain points are already filled in
+    industry_key = get_industry_key(industry)
+    if industry_key:
+        subject, template = FALLBACK_EMAILS[industry_key]
+    else:
+        subject, template = EMAIL_SUBJECT_1, INITIAL_EMAIL
+    
+    html_body = template.render({
+        'first_name': greeting,
+        'industry': industry if industry else 'business',
+        'tracking_link': tracking_link
+    })
+    
+    return subject, html_body
 
-<p>See your real-time cash flow: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
 
-<p>— <br>
-Greg Pober<br>
-CEO | I AM CFO<br>
-<a href="mailto:gpober@iamcfo.com">gpober@iamcfo.com</a> • 954-684-9011</p>
+def personalization_key(prospect):
+    """Same prospect data + same prompt version = same email"""
+    return personalization_cache.make_key(prospect, PROMPT_FIELDS, PROMPT_VERSION)
 
-<p style="font-size: 14px; color: #666;"><strong>P.S.</strong> Connects to your QuickBooks/Xero. Set up within 24 hours. See your cash position today.</p>
 
-</body>
-</html>"""
-        else:
-            subject = EMAIL_SUBJECT_1
-            html_body = EMAIL_HTML_1.format(
-                first_name=greeting,
-                industry=industry,
-                tracking_link=tracking_link
-            )
-        
-        return subject, html_body
+def prepared_personalization(prospect):
+    """(subject, html) from the overnight Message Batch, or None if missing or made from older data/prompts"""
+    if prospect.get('personalized_html') and prospect.get('personalized_key') == personalization_key(prospect):
+        return prospect['personalized_subject'], prospect['personalized_html']
+    return None
 
 
-def send_email(prospect, subject, html_body):
-    """Send HTML email via SendGrid with tracking"""
+def personalize_with_claude(prospect):
+    """Use Claude to personalize the email based on prospect data and daily pain points"""
+    # Already personalized by the overnight Message Batch (prepare_personalization.py)
+    prepared = prepared_personalization(prospect)
+    if prepared:
+        return prepared
+    
+    # Reuse earlier generations for the same prospect data and prompt version
+    cache_key = personalization_key(prospect)
+    cache = personalization_store()
+    cached = cache.get(cache_key)
+    if cached:
+        return cached
+    
     try:
-        message = Mail(
-            from_email=(SENDER_EMAIL, SENDER_NAME),
-            to_emails=prospect['email'],
-            subject=subject,
-            html_content=html_body  # HTML content instead of plain text
-        )
+        request_params, subject, format_values = build_personalization_request(prospect)
+        claude = clients.claude()  # first call imports the SDK - keep that out of the timing
+        with metrics.timer('personalize'):
+            message = claude.messages.create(**request_params)
+        prompt_cache_stats.record(message.usage)
+        personalized_html = finish_personalization(message.content[0].text, format_values)
         
-        # Enable tracking
-        message.tracking_settings = TrackingSettings()
-        message.tracking_settings.click_tracking = ClickTracking(True, True)
-        message.tracking_settings.open_tracking = OpenTracking(True)
-        
-        # Send email
-        response = sendgrid.send(message)
-        
-        # Update database
-        supabase.table('prospects').update({
-            'email_sent': True,
-            'email_sent_at': datetime.now().isoformat(),
-            'sequence_step': 1
-        }).eq('id', prospect['id']).execute()
-        
-        print(f"✅ Sent to {prospect['email']} ({prospect.get('company', 'Unknown')})")
-        return True
+        cache.set(cache_key, subject, personalized_html)
+        return subject, personalized_html
         
     except Exception as e:
-        print(f"❌ Failed to send to {prospect['email']}: {e}")
-        return False
+        print(f"⚠️ Claude personalization failed for {prospect['email']}: {e}")
+        
+        # Fallback to basic template
+        return fallback_personalization(prospect)
+
+
+@metrics.timed('send')
+def send_email(prospect, subject, html_body):
+    """Send HTML email via SendGrid with tracking (raises on failure)"""
+    from sendgrid.helpers.mail import Mail, TrackingSettings, ClickTracking, OpenTracking
+    
+    message = Mail(
+        from_email=(SENDER_EMAIL, SENDER_NAME),
+        to_emails=prospect['email'],
+        subject=subject,
+        html_content=html_body  # HTML content instead of plain text
+    )
+    
+    # Enable tracking
+    message.tracking_settings = TrackingSettings()
+    message.tracking_settings.click_tracking = ClickTracking(True, True)
+    message.tracking_settings.open_tracking = OpenTracking(True)
+    
+    # Send email
+    response = clients.sendgrid().send(message)
+    
+    print(f"✅ Sent to {prospect['email']} ({prospect.get('company', 'Unknown')})")
+
+
+@metrics.timed('db_update')
+def mark_email_sent(prospect, sent_at=None):
+    """Record the initial send so the prospect enters the follow-up sequence"""
+    clients.supabase().table('prospects').update({
+        'email_sent': True,
+        'email_sent_at': sent_at or datetime.now().isoformat(),
+        'sequence_step': 1
+    }).eq('id', prospect['id']).execute()
+
+
+def mark_emails_sent(acks):
+    """Record a chunk of initial sends in one round trip (mark_prospects_emailed RPC)"""
+    with metrics.timer('db_update', items=len(acks)):
+        clients.supabase().rpc('mark_prospects_emailed', {
+            'p_ids': [ack['id'] for ack in acks],
+            'p_sent_at': [ack['sent_at'] for ack in acks]
+        }).execute()
+
+
+def open_ack_buffer():
+    """Buffer for sent acknowledgements - chunks go through the RPC, row-by-row if it fails"""
+    return AckBuffer('email', mark_emails_sent, lambda ack: mark_email_sent(ack, ack['sent_at']))
+
+
+def build_send_pipeline(prospects, acks):
+    """personalize -> send -> record, connected by bounded queues"""
+    limiter = RateLimiter(SEND_RATE_PER_MINUTE)
+    
+    def personalize(prospect):
+        subject, personalized_html = personalize_with_claude(prospect)
+        return prospect, subject, personalized_html
+    
+    def send(item):
+        prospect, subject, personalized_html = item
+        limiter.wait()
+        try:
+            send_email(prospect, subject, personalized_html)
+        except Exception as e:
+            raise RuntimeError(f"{prospect['email']}: {e}") from e
+        return prospect
+    
+    def record(prospect):
+        acks.add({
+            'id': prospect['id'],
+            'email': prospect['email'],
+            'sent_at': datetime.now().isoformat()
+        })
+    
+    return Pipeline('email', prospects, [
+        Stage('personalize', personalize, workers=SEND_CONCURRENCY),
+        Stage('send', send, workers=SEND_CONCURRENCY),
+        Stage('record', record),
+    ])
 
 
 def main():
     """Main execution"""
+    config.require(*REQUIRED_ENV)
+    metrics.start('email_bot')
+    print(f"✅ SUPABASE_URL: {config.get(config.SUPABASE_URL)}")
+    print(f"✅ Environment variables loaded successfully")
+    
     print("=" * 60)
     print("🚀 I AM CFO EMAIL CAMPAIGN - Daily Cash Flow Solutions")
     print("=" * 60)
@@ -483,19 +486,18 @@ def main():
     print(f"🔗 Format: HTML with clean UTM-tracked links")
     print("-" * 60)
     
-    # Get prospects
-    prospects = get_prospects_to_email(BATCH_SIZE)
+    # Get prospects - streamed page by page into the pipeline
+    prospects = iter_prospects_to_email(BATCH_SIZE)
+    first_prospect = next(prospects, None)
     
-    if not prospects:
+    if first_prospect is None:
         print("ℹ️ No prospects to email. All caught up!")
         print("\nStatus:")
         # Get total counts
-        total_result = supabase.table('prospects').select('*', count='exact').execute()
-        sent_result = supabase.table('prospects').select('*', count='exact').eq('email_sent', True).execute()
-        
-        total_count = total_result.count if hasattr(total_result, 'count') else len(total_result.data)
-        sent_count = sent_result.count if hasattr(sent_result, 'count') else len(sent_result.data)
-        remaining = total_count - sent_count
+        stats = get_campaign_stats(clients.supabase())
+        total_count = stats['total']
+        sent_count = stats['sent']
+        remaining = stats['remaining']
         
         print(f"  📊 Total prospects: {total_count}")
         print(f"  ✅ Emails sent: {sent_count}")
@@ -505,60 +507,58 @@ def main():
             print(f"\n💡 {remaining} prospects remaining - they'll be sent tomorrow!")
         else:
             print(f"\n🎉 All prospects have been contacted!")
-        
         return
     
-    print(f"📧 Sending to {len(prospects)} prospects today")
-    
     # Calculate campaign progress
-    total_result = supabase.table('prospects').select('*', count='exact').execute()
-    sent_result = supabase.table('prospects').select('*', count='exact').eq('email_sent', True).execute()
+    stats = get_campaign_stats(clients.supabase())
+    total_count = stats['total']
+    sent_count = stats['sent']
+    sending_today = min(BATCH_SIZE, stats['remaining'])
+    remaining = stats['remaining'] - sending_today
     
-    total_count = total_result.count if hasattr(total_result, 'count') else len(total_result.data)
-    sent_count = sent_result.count if hasattr(sent_result, 'count') else len(sent_result.data)
-    remaining = total_count - sent_count - len(prospects)
+    print(f"📧 Sending to {sending_today} prospects today")
     
     days_remaining = (remaining + DAILY_SEND_LIMIT - 1) // DAILY_SEND_LIMIT  # Round up
     
     print(f"📊 Campaign Progress:")
     print(f"  Total prospects: {total_count}")
     print(f"  Already sent: {sent_count}")
-    print(f"  Sending today: {len(prospects)}")
+    print(f"  Sending today: {sending_today}")
     print(f"  Remaining after today: {remaining}")
+    print(f"  Replied: {stats['replied']}")
     if remaining > 0:
         print(f"  ⏰ Days remaining: ~{days_remaining} days")
     print("-" * 60)
     
-    sent_count_today = 0
-    failed_count = 0
+    print(f"⚡ Pipeline: {SEND_CONCURRENCY} workers, target {SEND_RATE_PER_MINUTE:g} emails/min")
     
-    for i, prospect in enumerate(prospects, 1):
-        print(f"\n[{i}/{len(prospects)}] Processing {prospect['email']}...")
-        
-        # Personalize email with Claude
-        print("  🤖 Personalizing with Claude AI...")
-        subject, personalized_html = personalize_with_claude(prospect)
-        
-        # Send email
-        print(f"  📤 Sending: {subject}")
-        if send_email(prospect, subject, personalized_html):
-            sent_count_today += 1
-        else:
-            failed_count += 1
-        
-        # Rate limiting: 10 seconds between emails
-        # This keeps us under SendGrid's limits and looks more natural
-        if i < len(prospects):
-            print("  ⏳ Waiting 10 seconds...")
-            time.sleep(10)
+    # Write whatever is still buffered even if the run is interrupted
+    acks = open_ack_buffer()
+    try:
+        pipeline = build_send_pipeline(itertools.chain([first_prospect], prospects), acks).run()
+    finally:
+        acks.close()
+    
+    sent_count_today = pipeline.stage('send').processed
+    failed_count = pipeline.stage('personalize').failed + pipeline.stage('send').failed
+    unrecorded_count = acks.failed
+    
+    elapsed_minutes = pipeline.elapsed / 60
     
     print("\n" + "=" * 60)
     print("✅ TODAY'S BATCH COMPLETE!")
     print("=" * 60)
     print(f"   Sent today: {sent_count_today}")
     print(f"   Failed: {failed_count}")
+    if unrecorded_count:
+        print(f"   ⚠️ Sent but not recorded: {unrecorded_count}")
     print(f"   Success rate: {(sent_count_today/(sent_count_today+failed_count)*100):.1f}%")
-    print(f"   Total time: ~{len(prospects) * 10 / 60:.1f} minutes")
+    print(f"   Total time: {elapsed_minutes:.1f} minutes")
+    print(f"   Personalization cache: {personalization_store().hits} hits, {personalization_store().misses} misses")
+    prompt_cache_stats.report()
+    acks.report()
+    pipeline.report()
+    metrics.finish()
     
     # Show next run info
     new_remaining = remaining
@@ -576,13 +576,19 @@ def main():
     
     print("=" * 60)
     
+    # Keep the personalization cache within its TTL and size limits
+    personalization_store().evict()
+    
     # Update daily analytics
     try:
-        supabase.rpc('update_daily_snapshot').execute()
+        clients.supabase().rpc('update_daily_snapshot').execute()
         print("📊 Analytics updated")
     except:
         pass
 
 
 if __name__ == '__main__':
-    main()
+    try:
+        profiling.run(main, 'email_bot')
+    finally:
+        transport.close()
@@ -0,0 +1,679 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Email Templates
+Every email template the bots send, compiled once at import into literal and
+placeholder segments. Rendering is a join over the segments instead of
+re-parsing a multi-kilobyte string with str.format for every prospect, and a
+template with an unknown {placeholder} fails at import rather than mid-send.
+No clients or environment needed - safe to import from anywhere.
+Author: Greg Pober
+
+Usage:
+    subject, template = FOLLOWUP_TEMPLATES[('hvac', 1)]
+    html_body = template.render({'first_name': ..., 'industry': ..., 'tracking_link': ...})
+"""
+
+from operator import itemgetter
+from string import Formatter
+
+from industry_index import IndustryIndex
+
+# Placeholders the send-time values fill in
+EMAIL_FIELDS = ('first_name', 'industry', 'tracking_link')
+
+# Extra placeholders in FALLBACK_INDUSTRY_HTML, filled from INDUSTRY_PAIN_POINTS at import
+PAIN_POINT_FIELDS = ('opening', 'pain', 'question', 'solution', 'example')
+
+
+class CompiledTemplate:
+    """
+    A template pre-split into literal text and placeholder slots
+
+    Parts alternate literal, slot, literal, ... so render() only has to drop
+    the values into the odd positions and join.
+    """
+
+    __slots__ = ('name', 'fields', '_parts', '_values')
+
+    def __init__(self, name, segments):
+        self.name = name
+        self._parts = []
+        fields = []
+        for literal, field in segments:
+            # Merge neighbouring literals (e.g. after partial())
+            if self._parts and len(self._parts) % 2 == 1:
+                self._parts[-1] += literal
+            else:
+                self._parts.append(literal)
+            if field is not None:
+                self._parts.append(None)
+                fields.append(field)
+        if len(self._parts) % 2 == 0:
+            self._parts.append('')
+
+        self.fields = tuple(fields)
+        if not fields:
+            self._values = None
+        elif len(fields) == 1:
+            field = fields[0]
+            self._values = lambda values: (values[field],)
+        else:
+            self._values = itemgetter(*fields)
+
+    def render(self, values):
+        """Fill the placeholders from a dict (extra keys are ignored)"""
+        if self._values is None:
+            return self._parts[0]
+        parts = list(self._parts)
+        parts[1::2] = self._values(values)
+        return ''.join(parts)
+
+    def partial(self, values, name=None):
+        """New template with some placeholders filled in now"""
+        segments = []
+        literal = ''
+        for index, part in enumerate(self._parts):
+            if index % 2 == 0:
+                literal += part
+                continue
+            field = self.fields[index // 2]
+            if field in values:
+                literal += values[field]
+            else:
+                segments.append((literal, field))
+                literal = ''
+        segments.append((literal, None))
+        return CompiledTemplate(name or self.name, segments)
+
+    def __repr__(self):
+        return f"<CompiledTemplate {self.name} {self.fields}>"
+
+
+def compile_template(name, source, fields=EMAIL_FIELDS):
+    """
+    Split a str.format-style template into segments
+
+    Raises:
+        ValueError: for a placeholder not in fields, or one using a
+        conversion or format spec (the templates never need them)
+    """
+    segments = []
+    for literal, field, spec, conversion in Formatter().parse(source):
+        if field is not None:
+            if field not in fields:
+                raise ValueError(f"{name}: unknown placeholder {{{field}}} (expected one of {', '.join(fields)})")
+            if spec or conversion:
+                raise ValueError(f"{name}: {{{field}}} uses a format spec or conversion")
+        segments.append((literal, field))
+    return CompiledTemplate(name, segments)
+
+
+# ============================================================================
+# INITIAL EMAIL - Daily Cash Flow Pain Points (HTML with UTM tracking)
+# ============================================================================
+
+EMAIL_SUBJECT_1 = "Can you afford to hire that new person?"
+EMAIL_HTML_1 = """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p>You're looking at the bank balance.<br>
+You're looking at the bills due.<br>
+You're trying to do the math in your head.</p>
+
+<p>"Can I afford this hire?"<br>
+"Should I wait another month?"<br>
+"What if that big invoice doesn't come in?"</p>
+
+<p>Every business owner asks these questions.<br>
+But most are flying blind with spreadsheets and guesswork.</p>
+
+<p><strong>I AM CFO shows you the answer in real-time:</strong></p>
+
+<p>✅ Today's actual cash position (not last month's)<br>
+✅ Your burn rate this week (see where money's going)<br>
+✅ Cash flow forecast (know what's coming in and out)<br>
+✅ Profit by location, service, or product (know what's working)</p>
+
+<p>One {industry} company used I AM CFO to discover they had $47K more cash available than they thought. They made the hire. Best decision they made.</p>
+
+<p>Another found they were losing $3K/month on their most popular service. Adjusted pricing. Turned it around in 30 days.</p>
+
+<p><strong>Real-time cash flow visibility = Better decisions.</strong></p>
+
+<p>👉 See your real-time cash flow: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>Worth 15 minutes to stop guessing?</p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+<p style="font-size: 14px; color: #666;"><strong>P.S.</strong> Connects to your QuickBooks/Xero Accounting Software. Set up within 24 hours. See your real cash position today.</p>
+
+</body>
+</html>"""
+
+
+# Alternative subject lines for A/B testing
+SUBJECT_LINES = [
+    "Can you afford to hire that new person?",
+    "What's your real cash position today?",
+    "Stop guessing about your cash flow",
+    "You're making million-dollar decisions with month-old data",
+    "How much cash can you actually spend this month?",
+    "The question every business owner asks daily",
+    "Why is cash always tighter than expected?",
+]
+
+
+# ============================================================================
+# INDUSTRY-SPECIFIC PAIN POINTS - Daily Cash Flow Struggles
+# ============================================================================
+
+INDUSTRY_PAIN_POINTS = {
+    'construction': {
+        'subject': "How much can you bid on that new job?",
+        'opening': "You've got a bid request. You need to decide: What can you afford to commit to?",
+        'pain': "Material costs are up. Labor's tight. You've got 3 jobs running and 2 more starting next month.",
+        'question': "Can you afford to take this job without stretching cash too thin?",
+        'solution': "I AM CFO shows you real-time cash flow by job. You'll know exactly what you can bid without putting the business at risk.",
+        'example': "A GC in Florida used I AM CFO to see they had $85K more available than expected. Bid on a $400K job. Won it. Profitable."
+    },
+    'restaurant': {
+        'subject': "Why does cash feel tighter than sales suggest?",
+        'opening': "Sales are up. But somehow, cash is still tight. What's going on?",
+        'pain': "Food costs fluctuate. Labor scheduling is a puzzle. Some locations feel more profitable than others, but which ones?",
+        'question': "Where is your cash actually going?",
+        'solution': "I AM CFO shows real-time P&L by location and tracks your actual food cost percentage daily.",
+        'example': "A 3-location restaurant group discovered one location was bleeding $4K/month. Fixed vendor pricing. Turned profitable in 6 weeks."
+    },
+    'property management': {
+        'subject': "Which properties are actually making you money?",
+        'opening': "You've got 8 properties. Some feel profitable. Some don't. But which ones actually are?",
+        'pain': "Maintenance costs spike unexpectedly. Vacancy rates change. Some properties just seem to eat cash.",
+        'question': "Can you see profit by property in real-time?",
+        'solution': "I AM CFO gives you real-time profitability by property. You'll know exactly which ones are winners and which need attention.",
+        'example': "A PM company found 2 of their 12 properties were breakeven or worse. Raised rents on one, sold the other. Added $6K/month profit."
+    },
+    'hvac': {
+        'subject': "Can you afford that new truck?",
+        'opening': "Your truck has 180K miles. You need to replace it. But can you afford it right now?",
+        'pain': "Jobs are booked out 3 weeks. Revenue looks good on paper. But cash? That's harder to see.",
+        'question': "What's your real cash position today?",
+        'solution': "I AM CFO shows today's cash, this week's burn rate, and projects your cash flow for the next 90 days.",
+        'example': "An HVAC company saw they had $65K available. Bought 2 trucks. Took on more jobs. Grew 40% in 6 months."
+    },
+    'professional services': {
+        'subject': "Are you actually making money on that client?",
+        'opening': "You've got a big client. Lots of hours. But are you actually profitable on them?",
+        'pain': "Some clients take way more time than others. Scope creep happens. You bill hours but don't track true profitability.",
+        'question': "Which clients are making you money and which are costing you?",
+        'solution': "I AM CFO tracks profitability by client and project in real-time. You'll know exactly who's worth the effort.",
+        'example': "A consulting firm found their 3rd biggest client was their least profitable. Raised rates. Client said yes. Added $5K/month margin."
+    },
+    'automotive': {
+        'subject': "Why does cash disappear faster than expected?",
+        'opening': "Parts are expensive. Labor costs are up. Sales look good. But cash always feels tight.",
+        'pain': "You're juggling parts inventory, labor scheduling, and customer payments. Cash flow is a daily puzzle.",
+        'question': "Where is your cash actually going?",
+        'solution': "I AM CFO shows real-time cash flow with daily burn rate, accounts payable coming due, and receivables coming in.",
+        'example': "An auto shop discovered they were sitting on $35K in parts inventory they didn't need. Liquidated it. Freed up cash."
+    },
+    'manufacturing': {
+        'subject': "Can you afford that equipment upgrade?",
+        'opening': "You need new equipment. It would help production. But can you afford it without stretching too thin?",
+        'pain': "Material costs change. Production schedules shift. Some products are more profitable than others, but which?",
+        'question': "What's your real cash position and burn rate?",
+        'solution': "I AM CFO gives you real-time cash flow with 90-day projections so you can make big decisions with confidence.",
+        'example': "A manufacturer saw they had $120K available. Bought new equipment. Increased capacity 30%. ROI in 8 months."
+    },
+    'healthcare': {
+        'subject': "When will that insurance payment actually hit?",
+        'opening': "You've got receivables out there. Some insurance. Some patient pay. But when does cash actually come in?",
+        'pain': "Insurance delays. Patient payment plans. Revenue is complicated to track and cash flow even more so.",
+        'question': "What's your real cash position today?",
+        'solution': "I AM CFO tracks cash flow in real-time and projects when receivables will actually convert to cash.",
+        'example': "A medical practice saw they had $45K in receivables over 90 days. Focused collections. Brought in $38K in 30 days."
+    },
+}
+
+# Fallback industry email, used when Claude is unavailable
+FALLBACK_INDUSTRY_HTML = """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p>{opening}</p>
+
+<p>{pain}</p>
+
+<p><strong>{question}</strong></p>
+
+<p>{solution}</p>
+
+<p>{example}</p>
+
+<p>See your real-time cash flow: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+<p style="font-size: 14px; color: #666;"><strong>P.S.</strong> Connects to your QuickBooks/Xero. Set up within 24 hours. See your cash position today.</p>
+
+</body>
+</html>"""
+
+
+# ============================================================================
+# FOLLOW-UP TEMPLATES - Cash Flow Pain Points
+# ============================================================================
+
+# Follow-up #1 - 2 days after initial (Reminder of the pain)
+FOLLOWUP_1_SUBJECT = "Re: Can you afford to hire that new person?"
+FOLLOWUP_1_HTML = """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p>Quick follow-up.</p>
+
+<p>You know that feeling when you're staring at the bank balance, trying to figure out if you can afford something?</p>
+
+<p>Hire that person?<br>
+Buy that equipment?<br>
+Take on that new project?</p>
+
+<p>Most business owners spend hours in spreadsheets trying to answer these questions.</p>
+
+<p><strong>I AM CFO answers them in seconds.</strong></p>
+
+<p>Real-time cash position. Burn rate. Cash flow forecast.</p>
+
+<p>One {industry} owner told me: <em>"I spent 3 hours last month trying to figure out if I could hire. Now I just look at the dashboard. Takes 10 seconds."</em></p>
+
+<p>Worth 15 minutes to see it?</p>
+
+<p>👉 <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com" style="color: #0066cc; text-decoration: none;">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+<p style="font-size: 14px; color: #666;"><strong>P.S.</strong> Still connects to QuickBooks. Still takes 30 minutes to set up. Still shows your cash position today.</p>
+
+</body>
+</html>"""
+
+
+# Follow-up #2 - 3 days after follow-up #1 (Social proof + urgency)
+FOLLOWUP_2_SUBJECT = "Making decisions with month-old data"
+FOLLOWUP_2_HTML = """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p><strong>Straight talk:</strong></p>
+
+<p>You're making hiring decisions with month-old data.<br>
+You're bidding jobs with last month's costs.<br>
+You're planning purchases without knowing today's cash position.</p>
+
+<p>That's not a criticism. That's just how traditional bookkeeping works.</p>
+
+<p>But here's what changed for one {industry} company:</p>
+
+<p><strong>Before I AM CFO:</strong><br>
+• "Can we afford this?" = 2 hours in spreadsheets<br>
+• Found out about problems weeks too late<br>
+• Made decisions based on guesses</p>
+
+<p><strong>After I AM CFO:</strong><br>
+• "Can we afford this?" = 10 seconds<br>
+• See problems the day they start<br>
+• Make decisions based on data</p>
+
+<p>The difference? <strong>Real-time cash flow visibility.</strong></p>
+
+<p>See it yourself: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com" style="color: #0066cc; text-decoration: none;">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+<p style="font-size: 14px; color: #666;"><strong>P.S.</strong> $699/month. Or keep guessing. Your call.</p>
+
+</body>
+</html>"""
+
+
+# Follow-up #3 - 3 days after follow-up #2 (Final value reminder)
+FOLLOWUP_3_SUBJECT = "Last one from me"
+FOLLOWUP_3_HTML = """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p>I'll keep this short.</p>
+
+<p>Three questions you probably asked yourself this week:</p>
+
+<p><strong>1.</strong> "Can I afford to hire that person?"<br>
+<strong>2.</strong> "Why is cash tighter than I expected?"<br>
+<strong>3.</strong> "Which location/client/project is actually profitable?"</p>
+
+<p>If you're still answering these with spreadsheets and guesswork, that's on you.</p>
+
+<p><strong>I AM CFO gives you the answer in real-time.</strong></p>
+
+<p>$699/month to stop guessing about your cash flow.</p>
+
+<p>See it: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com" style="color: #0066cc; text-decoration: none;">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+<p style="font-size: 14px; color: #666;"><strong>P.S.</strong> If you're good with month-old data and spreadsheet math, ignore this. If you want to see your cash position today, click the link.</p>
+
+</body>
+</html>"""
+
+
+# ============================================================================
+# INDUSTRY-SPECIFIC FOLLOW-UPS (More targeted)
+# ============================================================================
+
+INDUSTRY_FOLLOWUPS = {
+    'construction': {
+        'subject_1': "Re: How much can you bid on that new job?",
+        'followup_1': """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p>Quick follow-up on that bid question.</p>
+
+<p>You've got materials fluctuating. Labor's tight. Jobs overlapping.</p>
+
+<p>And you're trying to figure out: <strong>"Can I afford to take on this next job?"</strong></p>
+
+<p>Most GCs spend hours in spreadsheets trying to answer this.</p>
+
+<p><strong>I AM CFO shows you:</strong><br>
+• Real-time cash by job<br>
+• What you can actually commit to<br>
+• Where you're profitable vs. bleeding</p>
+
+<p>A GC in Tampa told me: <em>"I used to spend Friday afternoons doing cash flow math. Now I check my phone. Takes 30 seconds."</em></p>
+
+<p>See it: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com" style="color: #0066cc; text-decoration: none;">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+</body>
+</html>""",
+        
+        'subject_2': "Stop bidding jobs blind",
+        'followup_2': """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p><strong>Real talk:</strong> Are you bidding jobs based on last month's costs?</p>
+
+<p>Materials went up 8% two weeks ago. Your bid spreadsheet doesn't know that yet.</p>
+
+<p><strong>I AM CFO shows you real-time costs, real-time margins, real-time cash available.</strong></p>
+
+<p>One GC found they were underbidding by 12% on concrete work. Caught it week 1 instead of month 3. Saved $40K on the next 5 jobs.</p>
+
+<p>That's 57 months of I AM CFO paid for by one insight.</p>
+
+<p>See your real-time job costs: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com" style="color: #0066cc; text-decoration: none;">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+</body>
+</html>""",
+        
+        'subject_3': "Last chance (from me)",
+        'followup_3': """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p>Your competitors are seeing their job profitability in real-time.</p>
+
+<p>You'll see yours in 3 weeks when your bookkeeper closes the books.</p>
+
+<p>The gap between you and them is growing.</p>
+
+<p><strong>$699/month to stop flying blind.</strong></p>
+
+<p><a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com" style="color: #0066cc; text-decoration: none;">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+</body>
+</html>"""
+    },
+    
+    'restaurant': {
+        'subject_1': "Re: Why does cash feel tighter than sales suggest?",
+        'followup_1': """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p>Quick follow-up on that cash flow question.</p>
+
+<p>Sales are up. Tables are full. But somehow cash is tight.</p>
+
+<p>Where's it going?</p>
+
+<p>Most restaurant owners spend hours trying to figure this out.</p>
+
+<p><strong>I AM CFO shows you:</strong><br>
+• Real-time P&L by location<br>
+• Food cost percentage today (not month-end)<br>
+• Which locations print money vs. bleed cash</p>
+
+<p>A restaurant group told me: <em>"We discovered one location was losing $4K/month. Fixed it in week 1 instead of finding out in month 3."</em></p>
+
+<p>See your real-time restaurant numbers: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com" style="color: #0066cc; text-decoration: none;">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+</body>
+</html>""",
+        
+        'subject_2': "Your food cost spiked last week",
+        'followup_2': """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p>Actually, I don't know if your food cost spiked last week.</p>
+
+<p>But you probably don't either.</p>
+
+<p>You'll find out in 3 weeks when your bookkeeper's report comes in.</p>
+
+<p>By then? You've bled another 3 weeks of margin.</p>
+
+<p><strong>I AM CFO shows food cost percentage daily. By location. In real-time.</strong></p>
+
+<p>One 3-location group found their downtown spot was 6% higher than the other two. Fixed vendor pricing. Added $48K/year profit.</p>
+
+<p>See your real-time food cost: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com" style="color: #0066cc; text-decoration: none;">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+</body>
+</html>""",
+        
+        'subject_3': "Closing your file",
+        'followup_3': """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p>No response — I get it.</p>
+
+<p>If you ever want to see which locations are actually profitable (in real-time, not month-end), you know where to find me.</p>
+
+<p><a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com" style="color: #0066cc; text-decoration: none;">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+</body>
+</html>"""
+    },
+    
+    'hvac': {
+        'subject_1': "Re: Can you afford that new truck?",
+        'followup_1': """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p>Quick follow-up on that truck question.</p>
+
+<p>You need equipment. Business is good. But is cash actually available?</p>
+
+<p>Most HVAC owners spend Friday doing mental math trying to figure this out.</p>
+
+<p><strong>I AM CFO shows you:</strong><br>
+• Today's cash position<br>
+• This week's burn rate<br>
+• 90-day cash flow projection</p>
+
+<p>An HVAC company in Miami told me: <em>"We saw we had $65K available. Bought 2 trucks. Took on 40% more jobs. Grew faster than we thought possible."</em></p>
+
+<p>See your real-time cash position: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com" style="color: #0066cc; text-decoration: none;">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+</body>
+</html>""",
+        
+        'subject_2': "Your cash is tighter than it should be",
+        'followup_2': """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p>You're booked out 3 weeks. Revenue looks good.</p>
+
+<p>But cash? Cash feels tight.</p>
+
+<p>Why?</p>
+
+<p>Most HVAC owners don't know because they're looking at month-old data.</p>
+
+<p><strong>I AM CFO shows you real-time:</strong><br>
+• Where cash is going (A/P, payroll, materials)<br>
+• What's coming in (A/R aging, payment schedule)<br>
+• What you actually have available today</p>
+
+<p>One HVAC company found they were sitting on $35K in parts inventory they didn't need. Liquidated it. Freed up cash for the trucks they did need.</p>
+
+<p>See where your cash is going: <a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com" style="color: #0066cc; text-decoration: none;">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+</body>
+</html>""",
+        
+        'subject_3': "Equipment or wait?",
+        'followup_3': """<html>
+<body style="font-family: Arial, sans-serif; font-size: 16px; line-height: 1.6; color: #333;">
+
+<p>{first_name},</p>
+
+<p>That equipment question isn't going away.</p>
+
+<p>You can keep guessing about cash availability.</p>
+
+<p>Or you can see it in real-time.</p>
+
+<p><strong>$699/month vs. guessing wrong on a $50K decision.</strong></p>
+
+<p><a href="{tracking_link}" style="color: #0066cc; text-decoration: none;">info.iamcfo.com</a></p>
+
+<p>— <br>
+Greg Pober<br>
+CEO | I AM CFO<br>
+<a href="mailto:gpober@iamcfo.com" style="color: #0066cc; text-decoration: none;">gpober@iamcfo.com</a> • 954-684-9011</p>
+
+</body>
+</html>"""
+    },
+}
+
+
+# ============================================================================
+# COMPILED TEMPLATES - built once at import
+# ============================================================================
+
+INITIAL_EMAIL = compile_template('EMAIL_HTML_1', EMAIL_HTML_1)
+
+# Free-text industry -> template key
+PAIN_POINT_INDEX = IndustryIndex(INDUSTRY_PAIN_POINTS)
+FOLLOWUP_INDEX = IndustryIndex(INDUSTRY_FOLLOWUPS)
+
+# industry key -> (subject, template) with the pain point text already filled in
+_FALLBACK_INDUSTRY = compile_template('FALLBACK_INDUSTRY_HTML', FALLBACK_INDUSTRY_HTML,
+                                      EMAIL_FIELDS + PAIN_POINT_FIELDS)
+FALLBACK_EMAILS = {
+    key: (pain_points['subject'],
+          _FALLBACK_INDUSTRY.partial({field: pain_points[field] for field in PAIN_POINT_FIELDS},
+                                     name=f'FALLBACK_INDUSTRY_HTML[{key}]'))
+    for key, pain_points in INDUSTRY_PAIN_POINTS.items()
+}
+
+# (industry key, step) -> (subject, template); industry key None = generic follow-up
+FOLLOWUP_TEMPLATES = {
+    (None, 1): (FOLLOWUP_1_SUBJECT, compile_template('FOLLOWUP_1_HTML', FOLLOWUP_1_HTML)),
+    (None, 2): (FOLLOWUP_2_SUBJECT, compile_template('FOLLOWUP_2_HTML', FOLLOWUP_2_HTML)),
+    (None, 3): (FOLLOWUP_3_SUBJECT, compile_template('FOLLOWUP_3_HTML', FOLLOWUP_3_HTML)),
+}
+for _key, _templates in INDUSTRY_FOLLOWUPS.items():
+    for _step in (1, 2, 3):
+        if f'subject_{_step}' in _templates and f'followup_{_step}' in _templates:
+            FOLLOWUP_TEMPLATES[(_key, _step)] = (
+                _templates[f'subject_{_step}'],
+                compile_template(f'INDUSTRY_FOLLOWUPS[{_key}][{_step}]', _templates[f'followup_{_step}'])
+            )
@@ -0,0 +1,13 @@
+"""
+I AM CFO - Core
+Shared configuration checks and lazily created API clients for the bots.
+Importing this package is cheap: the Supabase, SendGrid and Anthropic SDKs
+are only imported when a client is first asked for.
+Author: Greg Pober
+
+Usage:
+    from iamcfo import clients, config
+
+    config.require('SUPABASE_URL', 'SUPABASE_SERVICE_KEY')
+    clients.supabase().table('prospects')...
+"""
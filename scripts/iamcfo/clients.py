@@ -0,0 +1,81 @@
+"""
+I AM CFO - API Clients
+Supabase, SendGrid and Anthropic clients, each created (and its SDK
+imported) on first use and then shared for the rest of the run. A run
+that never sends an email never pays for importing SendGrid or Anthropic.
+SendGrid requests go through the shared pooled session in transport.py.
+"""
+
+import functools
+import threading
+
+from iamcfo import config
+
+
+def lazy(factory):
+    """Call factory once, on first use, and return the same object afterwards (thread-safe)"""
+    lock = threading.Lock()
+    created = []
+
+    @functools.wraps(factory)
+    def get():
+        if not created:
+            with lock:
+                if not created:
+                    created.append(factory())
+        return created[0]
+
+    get.created = lambda: bool(created)
+    return get
+
+
+class SendGridClient:
+    """
+    Minimal SendGrid v3 client: send(message) posts a sendgrid.helpers.mail.Mail
+    over the pooled transport. The SDK's own client opens a new connection for
+    every request.
+    """
+
+    API_URL = 'https://api.sendgrid.com'
+
+    def __init__(self, api_key, api_url=API_URL):
+        self.mail_send_url = f"{api_url.rstrip('/')}/v3/mail/send"
+        self.headers = {'Authorization': f'Bearer {api_key}'}
+
+    def send(self, message):
+        """Send a Mail. Returns the response; raises on a 4xx/5xx like the SDK does"""
+        from iamcfo import transport
+        response = transport.post(self.mail_send_url, json=message.get(), headers=self.headers)
+        if response.status_code >= 400:
+            raise RuntimeError(f"SendGrid HTTP {response.status_code}: {response.text[:200]}")
+        return response
+
+
+@lazy
+def supabase():
+    """Supabase client (service role). PostgREST already keeps an HTTP/2 connection pool"""
+    config.require(config.SUPABASE_URL, config.SUPABASE_SERVICE_KEY)
+    import httpx
+    from supabase import ClientOptions, create_client
+    from iamcfo import transport
+    options = ClientOptions(
+        postgrest_client_timeout=httpx.Timeout(transport.HTTP_READ_TIMEOUT, connect=transport.HTTP_CONNECT_TIMEOUT)
+    )
+    return create_client(config.get(config.SUPABASE_URL), config.get(config.SUPABASE_SERVICE_KEY), options)
+
+
+@lazy
+def sendgrid():
+    """SendGrid API client"""
+    config.require(config.SENDGRID_API_KEY)
+    return SendGridClient(config.get(config.SENDGRID_API_KEY),
+                          config.get(config.SENDGRID_API_URL, SendGridClient.API_URL))
+
+
+@lazy
+def claude():
+    """Anthropic client"""
+    config.require(config.ANTHROPIC_API_KEY)
+    import anthropic
+    return anthropic.Anthropic(api_key=config.get(config.ANTHROPIC_API_KEY),
+                               base_url=config.get(config.ANTHROPIC_BASE_URL))
@@ -0,0 +1,37 @@
+"""
+I AM CFO - Configuration
+One place to read and validate the environment variables the bots need.
+"""
+
+import os
+import sys
+
+SUPABASE_URL = 'SUPABASE_URL'
+SUPABASE_SERVICE_KEY = 'SUPABASE_SERVICE_KEY'
+SENDGRID_API_KEY = 'SENDGRID_API_KEY'
+ANTHROPIC_API_KEY = 'ANTHROPIC_API_KEY'
+
+# Optional API base URLs - point these at local stand-ins (benchmarks/fake_services.py)
+SENDGRID_API_URL = 'SENDGRID_API_URL'
+ANTHROPIC_BASE_URL = 'ANTHROPIC_BASE_URL'
+
+SECRETS_URL = 'https://github.com/gpober/iamcfo-marketing-automation/settings/secrets/actions'
+
+
+def get(name, default=None):
+    """Environment value, or default when unset or empty"""
+    return os.getenv(name) or default
+
+
+def missing(*names):
+    """Names from the list that aren't set"""
+    return [name for name in names if not os.getenv(name)]
+
+
+def require(*names):
+    """Exit with an error for the first variable that isn't set"""
+    for name in missing(*names):
+        print(f"❌ ERROR: {name} environment variable is not set!")
+        print(f"   Check your GitHub secrets at:")
+        print(f"   {SECRETS_URL}")
+        sys.exit(1)
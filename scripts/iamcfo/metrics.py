@@ -0,0 +1,257 @@
+"""
+I AM CFO - Run Metrics
+Latency histograms, item counts and error counts per bot stage (fetch,
+personalize, render, send, db_update), written at the end of every run as
+a JSON report and a Prometheus textfile (node_exporter textfile collector
+format) so we can see where wall-clock time goes.
+
+Usage:
+    metrics.start('email_bot')
+    with metrics.timer('fetch') as t:
+        rows = query.execute().data
+        t.items = len(rows)
+
+    @metrics.timed('send')
+    def send_email(...): ...
+
+    metrics.finish()  # also runs at exit if the bot crashes or returns early
+"""
+
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+METRICS_DIR = os.getenv('METRICS_DIR', '.metrics')  # '' or 'off' = don't write report files
+
+# Upper bounds in seconds, Prometheus-style (+Inf is implicit)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+PROM_PREFIX = 'iamcfo'
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound)] ending with ('+Inf', count)"""
+        running, out = 0, []
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            running += count
+            out.append((bound, running))
+        return out
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of a sorted list, or None if it's empty"""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+class StageStats:
+    """Raw call durations for one stage - bucketed only when the report is built"""
+
+    def __init__(self):
+        self.durations = []   # list.append is atomic, so recording a call takes no lock
+        self.errors = 0
+        self.extra_items = 0  # items beyond one per call (batched calls)
+
+    def summary(self):
+        ordered = sorted(self.durations)
+        histogram = Histogram()
+        for seconds in ordered:
+            histogram.observe(seconds)
+        calls, total = len(ordered), sum(ordered)
+        return {
+            'calls': calls,
+            'items': calls + self.extra_items,
+            'errors': self.errors,
+            'error_rate': self.errors / calls if calls else 0.0,
+            'total_seconds': total,
+            'mean_seconds': total / calls if calls else None,
+            'p50_seconds': percentile(ordered, 50),
+            'p95_seconds': percentile(ordered, 95),
+            'p99_seconds': percentile(ordered, 99),
+            'max_seconds': ordered[-1] if ordered else None,
+            'buckets': {str(bound): count for bound, count in histogram.cumulative()},
+        }
+
+
+class Timer:
+    """Times a with-block into a stage. An exception or fail() counts it as an error"""
+
+    def __init__(self, run, stage, items=1):
+        self.run = run
+        self.stage = stage
+        self.items = items
+        self.ok = True
+
+    def fail(self):
+        self.ok = False
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.run.observe(self.stage, time.monotonic() - self.started,
+                         ok=self.ok and exc_type is None, items=self.items)
+        return False
+
+
+class RunMetrics:
+    """Everything measured during one bot run"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.monotonic()
+        self.stages = {}
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def timer(self, stage, items=1):
+        return Timer(self, stage, items)
+
+    def observe(self, stage, seconds, ok=True, items=1):
+        stats = self.stages.get(stage)
+        if stats is None:
+            with self._lock:
+                stats = self.stages.setdefault(stage, StageStats())
+        stats.durations.append(seconds)
+        if items != 1 or not ok:
+            with self._lock:
+                stats.extra_items += items - 1
+                stats.errors += not ok
+
+    def report(self):
+        """Run report as a JSON-ready dict"""
+        with self._lock:
+            stages = {name: stats.summary() for name, stats in list(self.stages.items())}
+            return {
+                'bot': self.bot,
+                'started_at': self.started_at.isoformat(),
+                'finished_at': datetime.now(timezone.utc).isoformat(),
+                'duration_seconds': time.monotonic() - self._started,
+                'stages': stages,
+            }
+
+    def prometheus(self, report):
+        """Prometheus text exposition of a report"""
+        bot = f'bot="{self.bot}"'
+        lines = [
+            f'# HELP {PROM_PREFIX}_stage_duration_seconds Time per call in each bot stage',
+            f'# TYPE {PROM_PREFIX}_stage_duration_seconds histogram',
+        ]
+        for name, stage in report['stages'].items():
+            labels = f'{bot},stage="{name}"'
+            for bound, count in stage['buckets'].items():
+                lines.append(f'{PROM_PREFIX}_stage_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{PROM_PREFIX}_stage_duration_seconds_sum{{{labels}}} {stage["total_seconds"]:.6f}')
+            lines.append(f'{PROM_PREFIX}_stage_duration_seconds_count{{{labels}}} {stage["calls"]}')
+
+        for metric, field, help_text in (('stage_items_total', 'items', 'Items handled by each bot stage'),
+                                         ('stage_errors_total', 'errors', 'Failed calls in each bot stage')):
+            lines.append(f'# HELP {PROM_PREFIX}_{metric} {help_text}')
+            lines.append(f'# TYPE {PROM_PREFIX}_{metric} counter')
+            for name, stage in report['stages'].items():
+                lines.append(f'{PROM_PREFIX}_{metric}{{{bot},stage="{name}"}} {stage[field]}')
+
+        lines += [
+            f'# HELP {PROM_PREFIX}_run_duration_seconds Wall-clock time of the last run',
+            f'# TYPE {PROM_PREFIX}_run_duration_seconds gauge',
+            f'{PROM_PREFIX}_run_duration_seconds{{{bot}}} {report["duration_seconds"]:.3f}',
+            f'# HELP {PROM_PREFIX}_run_finished_timestamp_seconds When the last run finished',
+            f'# TYPE {PROM_PREFIX}_run_finished_timestamp_seconds gauge',
+            f'{PROM_PREFIX}_run_finished_timestamp_seconds{{{bot}}} {time.time():.0f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, directory=METRICS_DIR):
+        """Write <bot>.json and <bot>.prom. Returns the report"""
+        report = self.report()
+        if not directory or directory.lower() == 'off':
+            return report
+
+        os.makedirs(directory, exist_ok=True)
+        for suffix, content in (('json', json.dumps(report, indent=2)), ('prom', self.prometheus(report))):
+            path = os.path.join(directory, f'{self.bot}.{suffix}')
+            # Write-then-rename so a collector never reads a half-written file
+            with open(f'{path}.tmp', 'w') as f:
+                f.write(content)
+            os.replace(f'{path}.tmp', path)
+        return report
+
+    def print_summary(self, report):
+        print(f"\n⏱️ Stage timings ({report['duration_seconds']:.1f}s run):")
+        for name, stage in report['stages'].items():
+            p50, p99 = stage['p50_seconds'] or 0.0, stage['p99_seconds'] or 0.0
+            print(f"   {name:<12} {stage['calls']:>6} calls  {stage['items']:>6} items  "
+                  f"{stage['errors']:>4} errors ({stage['error_rate']:.1%})  "
+                  f"p50 {p50 * 1000:.0f}ms  p99 {p99 * 1000:.0f}ms  total {stage['total_seconds']:.1f}s")
+
+    def finish(self, quiet=False):
+        """Write the report files (once) and print the summary"""
+        if self.finished:
+            return
+        self.finished = True
+        try:
+            report = self.write()
+        except OSError as e:
+            print(f"⚠️ Could not write metrics to {METRICS_DIR}: {e}")
+            report = self.report()
+        if not quiet:
+            self.print_summary(report)
+            if METRICS_DIR and METRICS_DIR.lower() != 'off':
+                print(f"   Report: {METRICS_DIR}/{self.bot}.json, {METRICS_DIR}/{self.bot}.prom")
+
+
+_current = RunMetrics('iamcfo')
+
+
+def start(bot):
+    """Begin measuring a run. The report is written at exit even if finish() is never reached"""
+    global _current
+    _current = RunMetrics(bot)
+    atexit.register(_current.finish, quiet=True)
+    return _current
+
+
+def timer(stage, items=1):
+    """with metrics.timer('send'): ..."""
+    return _current.timer(stage, items)
+
+
+def timed(stage):
+    """Decorator: time every call of the function into stage"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Inlined rather than a Timer - this wraps per-prospect calls like rendering
+            started = time.monotonic()
+            ok = False
+            try:
+                result = func(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                _current.observe(stage, time.monotonic() - started, ok)
+        return wrapper
+    return decorate
+
+
+def finish():
+    """Write the report files and print the stage summary"""
+    _current.finish()
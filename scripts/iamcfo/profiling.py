@@ -0,0 +1,256 @@
+"""
+I AM CFO - Profiling Switch
+Runs a bot's main() under a profiler when PROFILE is set (or --profile is
+passed), and writes the results next to the run report in METRICS_DIR.
+
+Modes (comma-separated, e.g. PROFILE=sample,memory):
+    cpu     deterministic cProfile across every thread -> <bot>.prof + <bot>.cpu.txt
+    sample  wall-clock stack sampler, cheap enough for production -> <bot>.stacks.txt
+            (collapsed stacks for flamegraph.pl / speedscope) + top frames in <bot>.sample.txt
+    memory  tracemalloc -> top allocation sites and peak in <bot>.alloc.txt
+    all     cpu + memory
+
+Usage:
+    if __name__ == '__main__':
+        profiling.run(main, 'email_bot')
+
+    PROFILE=sample,memory python scripts/email_bot.py
+    python scripts/upload_prospects.py prospects.csv --profile=cpu
+"""
+
+import collections
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+from iamcfo import metrics
+
+PROFILE = os.getenv('PROFILE', '')                                          # cpu, sample, memory, all
+PROFILE_DIR = os.getenv('PROFILE_DIR') or (metrics.METRICS_DIR if metrics.METRICS_DIR.lower() != 'off' else '') \
+    or '.metrics'
+PROFILE_SAMPLE_MS = float(os.getenv('PROFILE_SAMPLE_MS', 5))                 # Stack sampling interval
+PROFILE_TRACEMALLOC_FRAMES = int(os.getenv('PROFILE_TRACEMALLOC_FRAMES', 1))  # Frames kept per allocation
+PROFILE_TOP = int(os.getenv('PROFILE_TOP', 30))                             # Lines in the text summaries
+
+MODES = ('cpu', 'sample', 'memory')
+
+
+def parse_modes(value):
+    """'all' / 'cpu,memory' / '1' -> set of modes (unknown names are ignored with a warning)"""
+    modes = set()
+    for name in filter(None, (part.strip().lower() for part in value.split(','))):
+        if name == 'all':
+            modes |= {'cpu', 'memory'}
+        elif name in ('1', 'true', 'yes'):
+            modes.add('cpu')
+        elif name in MODES:
+            modes.add(name)
+        else:
+            print(f"⚠️ Unknown PROFILE mode '{name}' (use {', '.join(MODES)} or all)")
+    return modes
+
+
+def take_flag(argv):
+    """Remove --profile / --profile=MODES from argv. Returns the modes it asked for, or None"""
+    for index, arg in enumerate(argv[1:], 1):
+        if arg == '--profile' or arg.startswith('--profile='):
+            del argv[index]
+            return arg.partition('=')[2] or 'cpu'
+    return None
+
+
+class ThreadProfiles:
+    """
+    cProfile in the calling thread and every thread started afterwards
+
+    Before 3.12 a profiler only sees the thread that enabled it, so a
+    threading.setprofile hook starts one per new thread. From 3.12 cProfile
+    runs on sys.monitoring, where one profiler already sees every thread and
+    a second enable() raises ValueError.
+    """
+
+    per_thread = sys.version_info < (3, 12)
+
+    def __init__(self):
+        self.profiles = []
+        self._lock = threading.Lock()
+
+    def _new(self):
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        return profile
+
+    def _start_in_thread(self, frame, event, arg):
+        # First profile event in a new thread: swap this hook for a real profiler
+        self._new().enable()
+
+    def start(self):
+        if self.per_thread:
+            threading.setprofile(self._start_in_thread)
+        self._new().enable()
+
+    def stop(self):
+        if self.per_thread:
+            threading.setprofile(None)
+        self.profiles[0].disable()
+
+    def stats(self):
+        stats = pstats.Stats(self.profiles[0])
+        for profile in self.profiles[1:]:
+            try:
+                stats.add(profile)
+            except TypeError:
+                pass  # thread never recorded a call
+        return stats
+
+
+class StackSampler:
+    """Samples every thread's stack on a timer (wall-clock: waiting shows up too)"""
+
+    def __init__(self, interval_ms=PROFILE_SAMPLE_MS):
+        self.interval = interval_ms / 1000
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    @staticmethod
+    def _label(code):
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def top_frames(self, limit):
+        """(leaf frame, share of samples) for the frames most often on top of a stack"""
+        leaves = collections.Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [(frame, count / total) for frame, count in leaves.most_common(limit)]
+
+
+class Profiler:
+    """One profiled run: start() before main, stop() + write() after"""
+
+    def __init__(self, bot, modes, directory=PROFILE_DIR):
+        self.bot = bot
+        self.modes = modes
+        self.directory = directory
+        self.cpu = ThreadProfiles() if 'cpu' in modes else None
+        self.sampler = StackSampler() if 'sample' in modes else None
+        self.elapsed = 0.0
+
+    def start(self):
+        if 'memory' in self.modes:
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+        if self.sampler:
+            self.sampler.start()
+        self._started = time.monotonic()
+        if self.cpu:
+            self.cpu.start()
+        return self
+
+    def stop(self):
+        if self.cpu:
+            self.cpu.stop()
+        self.elapsed = time.monotonic() - self._started
+        if self.sampler:
+            self.sampler.stop()
+
+    def _path(self, suffix):
+        return os.path.join(self.directory, f'{self.bot}.{suffix}')
+
+    def write(self):
+        """Write every enabled profile. Returns the paths written"""
+        os.makedirs(self.directory, exist_ok=True)
+        written = []
+
+        if self.cpu:
+            stats = self.cpu.stats()
+            stats.dump_stats(self._path('prof'))
+            text = io.StringIO()
+            stats.stream = text
+            stats.sort_stats('cumulative').print_stats(PROFILE_TOP)
+            stats.sort_stats('tottime').print_stats(PROFILE_TOP)
+            with open(self._path('cpu.txt'), 'w') as f:
+                threads = f"{len(self.cpu.profiles)} thread(s)" if self.cpu.per_thread else "all threads"
+                f.write(f"{self.bot}: {self.elapsed:.1f}s wall, {threads} profiled\n")
+                f.write(text.getvalue())
+            written += [self._path('prof'), self._path('cpu.txt')]
+
+        if self.sampler:
+            with open(self._path('stacks.txt'), 'w') as f:
+                for stack, count in self.sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            with open(self._path('sample.txt'), 'w') as f:
+                f.write(f"{self.bot}: {self.sampler.samples} samples every {PROFILE_SAMPLE_MS:g}ms "
+                        f"over {self.elapsed:.1f}s (all threads, wall clock)\n\n")
+                for frame, share in self.sampler.top_frames(PROFILE_TOP):
+                    f.write(f"{share:>7.1%}  {frame}\n")
+            written += [self._path('stacks.txt'), self._path('sample.txt')]
+
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, pstats.__file__),
+                tracemalloc.Filter(False, __file__),  # the stack sampler's own counters
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            ])
+            tracemalloc.stop()
+            with open(self._path('alloc.txt'), 'w') as f:
+                f.write(f"{self.bot}: traced memory {current / 2**20:.1f} MB at exit, peak {peak / 2**20:.1f} MB\n\n")
+                f.write("Top allocation sites still alive at exit:\n")
+                for stat in snapshot.statistics('lineno')[:PROFILE_TOP]:
+                    f.write(f"  {stat.size / 1024:>10.1f} KB  {stat.count:>8} blocks  {stat.traceback}\n")
+            written.append(self._path('alloc.txt'))
+
+        return written
+
+
+def run(main, bot, argv=sys.argv):
+    """Call main(), profiled if PROFILE or --profile asks for it. Returns main()'s result"""
+    flag = take_flag(argv)
+    modes = parse_modes(flag if flag is not None else PROFILE)
+    if not modes:
+        return main()
+
+    print(f"🔬 Profiling {bot}: {', '.join(sorted(modes))}")
+    profiler = Profiler(bot, modes).start()
+    try:
+        return main()
+    finally:
+        profiler.stop()
+        try:
+            paths = profiler.write()
+            print(f"🔬 Profile written: {', '.join(paths)}")
+        except OSError as e:
+            print(f"⚠️ Could not write profile to {profiler.directory}: {e}")
@@ -0,0 +1,78 @@
+"""
+I AM CFO - HTTP Transport
+One pooled, keep-alive HTTP session shared by every outbound call the bots
+make directly (SendGrid, LinkedIn), so TCP+TLS setup is paid once per host
+per run instead of once per request. HTTP/2 (via httpx, multiplexed over a
+single connection) is used when HTTP2=true and the h2 package is installed.
+"""
+
+import os
+
+from iamcfo.clients import lazy
+
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))                  # Keep-alive connections per host
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))     # Seconds to establish a connection
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))          # Seconds to wait for a response
+HTTP2 = os.getenv('HTTP2', 'false').lower() in ('1', 'true', 'yes')   # Prefer HTTP/2 when available
+
+
+@lazy
+def session():
+    """requests.Session with a sized connection pool (no automatic retries - callers decide)"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    pooled = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+    pooled.mount('https://', adapter)
+    pooled.mount('http://', adapter)
+    return pooled
+
+
+@lazy
+def http2_client():
+    """httpx.Client speaking HTTP/2, or None when HTTP2 is off or h2 isn't installed"""
+    if not HTTP2:
+        return None
+    try:
+        import httpx
+        # Raises ImportError itself when the h2 package is missing
+        return httpx.Client(
+            http2=True,
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE),
+        )
+    except ImportError:
+        print("⚠️ HTTP2=true but httpx[http2] isn't installed, using HTTP/1.1")
+        return None
+
+
+def request(method, url, **kwargs):
+    """
+    Send a request over the shared connection pool
+
+    Takes the usual headers/params/data/json keyword arguments. Returns a
+    response with status_code, text, json() and raise_for_status().
+    """
+    client = http2_client()
+    if client is not None:
+        return client.request(method, url, **kwargs)
+
+    kwargs.setdefault('timeout', (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    return session().request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def close():
+    """Close pooled connections (only those that were opened)"""
+    if session.created():
+        session().close()
+    if http2_client.created() and http2_client() is not None:
+        http2_client().close()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Industry Matching
+Maps a prospect's free-text industry ("Commercial Construction & HVAC") to
+one of our template keys. All keys are compiled into a single regex once,
+results are memoized per raw string, and when several keys appear the
+longest one wins (then the earliest), so the answer never depends on dict
+order.
+Author: Greg Pober
+
+Usage:
+    index = IndustryIndex(INDUSTRY_PAIN_POINTS)
+    index.match('Commercial HVAC')          # 'hvac'
+    index.match_many(['Restaurants', None])  # ['restaurant', None]
+"""
+
+import os
+import re
+from functools import lru_cache
+
+INDUSTRY_MEMO_SIZE = int(os.getenv('INDUSTRY_MEMO_SIZE', 4096))  # Distinct industry strings remembered
+
+_SEPARATORS = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_industry(text):
+    """Lowercase, with any run of punctuation/whitespace collapsed to one space"""
+    return _SEPARATORS.sub(' ', text.lower()).strip()
+
+
+class IndustryIndex:
+    """Substring matcher over a fixed set of industry keys"""
+
+    def __init__(self, keys):
+        # normalized form -> original key
+        self.keys = {normalize_industry(key): key for key in keys}
+
+        # Longest alternatives first so each position prefers the longest key;
+        # the lookahead lets matches overlap ("construction" inside "construction services")
+        alternatives = '|'.join(re.escape(key) for key in sorted(self.keys, key=len, reverse=True))
+        self._pattern = re.compile(f'(?=({alternatives}))')
+
+        self.match = lru_cache(maxsize=INDUSTRY_MEMO_SIZE)(self._match)
+
+    def _match(self, industry):
+        """Key for a raw industry string, or None"""
+        if not industry:
+            return None
+
+        best = None
+        for found in self._pattern.finditer(normalize_industry(industry)):
+            if best is None or len(found.group(1)) > len(best):
+                best = found.group(1)
+
+        return self.keys[best] if best else None
+
+    def match_many(self, industries):
+        """Keys for a batch of industry strings (each distinct string is matched once)"""
+        return [self.match(industry) for industry in industries]
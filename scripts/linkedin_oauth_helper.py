@@ -9,7 +9,7 @@ import os
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import urllib.parse
 import webbrowser
-import requests
+from iamcfo import transport
 
 # LinkedIn OAuth Configuration
 CLIENT_ID = input("Enter your LinkedIn Client ID: ").strip()
@@ -37,7 +37,7 @@ class OAuthHandler(BaseHTTPRequestHandler):
             self.send_response(200)
             self.send_header('Content-type', 'text/html')
             self.end_headers()
-            self.wfile.write(b"""
+            self.wfile.write("""
                 <html>
                     <body style="font-family: Arial; text-align: center; padding: 50px;">
                         <h1 style="color: #00BFFF;">Success! ✅</h1>
@@ -45,7 +45,7 @@ class OAuthHandler(BaseHTTPRequestHandler):
                         <p>Go back to your terminal to complete the setup.</p>
                     </body>
                 </html>
-            """)
+            """.encode())
         else:
             # Error response
             self.send_response(400)
@@ -123,7 +123,7 @@ def exchange_code_for_token(code):
     }
     
     try:
-        response = requests.post(token_url, data=data)
+        response = transport.post(token_url, data=data)
         
         if response.status_code == 200:
             token_data = response.json()
@@ -160,7 +160,7 @@ def get_organization_id(access_token):
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = transport.get(url, headers=headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Personalization Cache
+Keeps Claude-generated emails so retries and reruns don't pay for the same
+generation twice. Keys are a hash of the prompt-relevant prospect fields
+plus the prompt version; values are the subject and HTML, zlib-compressed.
+Author: Greg Pober
+
+Backends (PERSONALIZATION_CACHE):
+    file      - one compressed file per entry under PERSONALIZATION_CACHE_DIR (default)
+    supabase  - personalization_cache table (database/migrations/002_personalization_cache.sql)
+    off       - no caching
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+
+PERSONALIZATION_CACHE = os.getenv('PERSONALIZATION_CACHE', 'file').lower()
+PERSONALIZATION_CACHE_DIR = os.getenv('PERSONALIZATION_CACHE_DIR', '.cache/personalization')
+PERSONALIZATION_CACHE_TTL_DAYS = float(os.getenv('PERSONALIZATION_CACHE_TTL_DAYS', 30))
+PERSONALIZATION_CACHE_MAX_MB = float(os.getenv('PERSONALIZATION_CACHE_MAX_MB', 200))
+
+
+def make_key(prospect, fields, version):
+    """Hash the prompt-relevant prospect fields together with the prompt version"""
+    relevant = {field: prospect.get(field) for field in fields}
+    payload = json.dumps([version, relevant], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def encode_entry(subject, html_body):
+    """Compress a cached email"""
+    payload = json.dumps({'subject': subject, 'html': html_body})
+    return zlib.compress(payload.encode('utf-8'), 9)
+
+
+def decode_entry(blob):
+    """Decompress a cached email. Returns (subject, html_body)"""
+    entry = json.loads(zlib.decompress(blob).decode('utf-8'))
+    return entry['subject'], entry['html']
+
+
+class NullCache:
+    """Cache that never hits - used when PERSONALIZATION_CACHE=off"""
+
+    hits = 0
+    misses = 0
+
+    def get(self, key):
+        self.misses += 1
+        return None
+
+    def set(self, key, subject, html_body):
+        pass
+
+    def evict(self):
+        pass
+
+
+class FileCache:
+    """Compressed files on local disk with TTL and oldest-first size eviction"""
+
+    def __init__(self, directory, ttl_seconds, max_bytes):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(size for _, _, size in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json.z")
+
+    def _entries(self):
+        """(path, mtime, size) for every cache file"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json.z'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def _remove(self, path, size):
+        try:
+            os.remove(path)
+            self._total_bytes -= size
+        except FileNotFoundError:
+            pass
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+            if time.time() - stat.st_mtime > self.ttl_seconds:
+                with self._lock:
+                    self._remove(path, stat.st_size)
+                return self._record(None)
+
+            with open(path, 'rb') as f:
+                return self._record(decode_entry(f.read()))
+        except FileNotFoundError:
+            return self._record(None)
+        except Exception as e:
+            print(f"⚠️ Personalization cache read failed: {e}")
+            return self._record(None)
+
+    def _record(self, entry):
+        """Count a hit or miss (get runs on several pipeline workers at once). Returns entry"""
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, key, subject, html_body):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            blob = encode_entry(subject, html_body)
+            with open(tmp_path, 'wb') as f:
+                f.write(blob)
+
+            with self._lock:
+                try:
+                    self._total_bytes -= os.stat(path).st_size
+                except FileNotFoundError:
+                    pass
+                os.replace(tmp_path, path)
+                self._total_bytes += len(blob)
+
+                if self._total_bytes > self.max_bytes:
+                    self.evict()
+        except Exception as e:
+            print(f"⚠️ Personalization cache write failed: {e}")
+
+    def evict(self):
+        """Drop expired entries, then the oldest ones until under the size limit"""
+        now = time.time()
+        for path, mtime, size in sorted(self._entries(), key=lambda entry: entry[1]):
+            if now - mtime > self.ttl_seconds or self._total_bytes > self.max_bytes:
+                self._remove(path, size)
+
+
+class SupabaseCache:
+    """personalization_cache table in Supabase, values stored as base64 zlib"""
+
+    def __init__(self, supabase, ttl_seconds, max_bytes):
+        self.supabase = supabase
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        try:
+            cutoff = (datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)).isoformat()
+            response = self.supabase.table('personalization_cache')\
+                .select('value')\
+                .eq('key', key)\
+                .gte('created_at', cutoff)\
+                .limit(1)\
+                .execute()
+
+            if not response.data:
+                return self._record(None)
+
+            return self._record(decode_entry(base64.b64decode(response.data[0]['value'])))
+        except Exception as e:
+            print(f"⚠️ Personalization cache read failed: {e}")
+            return self._record(None)
+
+    _record = FileCache._record
+
+    def set(self, key, subject, html_body):
+        try:
+            blob = encode_entry(subject, html_body)
+            self.supabase.table('personalization_cache').upsert({
+                'key': key,
+                'value': base64.b64encode(blob).decode('ascii'),
+                'size_bytes': len(blob),
+                'created_at': datetime.now(timezone.utc).isoformat()
+            }, on_conflict='key').execute()
+        except Exception as e:
+            print(f"⚠️ Personalization cache write failed: {e}")
+
+    def evict(self):
+        """Drop expired entries, then the oldest ones until under the size limit"""
+        try:
+            self.supabase.rpc('evict_personalization_cache', {
+                'ttl_seconds': int(self.ttl_seconds),
+                'max_bytes': int(self.max_bytes)
+            }).execute()
+        except Exception as e:
+            print(f"⚠️ Personalization cache eviction failed: {e}")
+
+
+def open_cache(supabase=None):
+    """Create the cache backend selected by PERSONALIZATION_CACHE"""
+    ttl_seconds = PERSONALIZATION_CACHE_TTL_DAYS * 24 * 60 * 60
+    max_bytes = PERSONALIZATION_CACHE_MAX_MB * 1024 * 1024
+
+    if PERSONALIZATION_CACHE == 'supabase' and supabase is not None:
+        return SupabaseCache(supabase, ttl_seconds, max_bytes)
+    if PERSONALIZATION_CACHE == 'file':
+        return FileCache(PERSONALIZATION_CACHE_DIR, ttl_seconds, max_bytes)
+    return NullCache()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Streaming Send Pipeline
+Runs fetch -> render -> send -> mark-sent as stages connected by bounded
+queues, each with its own worker threads. A full queue blocks the stage
+feeding it, so personalization can run ahead of sending (and sending ahead
+of the DB write) without ever holding the whole batch in memory.
+Author: Greg Pober
+
+Usage:
+    pipeline = Pipeline('email', prospects, [
+        Stage('personalize', personalize, workers=10),
+        Stage('send', send, workers=10),
+        Stage('record', record),
+    ])
+    pipeline.run()
+    pipeline.stage('send').processed
+"""
+
+import os
+import queue
+import threading
+import time
+
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 50))  # Max items waiting in front of each stage
+PIPELINE_PROGRESS_SECONDS = float(os.getenv('PIPELINE_PROGRESS_SECONDS', 30))  # 0 = no progress lines
+
+_DONE = object()  # End-of-stream marker, one per worker
+
+
+class Stage:
+    """
+    One pipeline step
+
+    func gets an item and returns the item for the next stage. Returning None
+    drops the item; raising counts it as failed. With fan_out=True the return
+    value is an iterable and each element is passed on separately.
+    """
+
+    def __init__(self, name, func, workers=1, queue_size=None, fan_out=False):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize=queue_size or PIPELINE_QUEUE_SIZE)
+        self.fan_out = fan_out
+
+        # Counters
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+        self._workers_left = self.workers
+
+    def put(self, item):
+        """Queue an item for this stage (blocks while the queue is full)"""
+        self.queue.put(item)
+        depth = self.queue.qsize()
+        if depth > self.max_queue_depth:
+            with self._lock:
+                self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def _record(self, ok, seconds):
+        with self._lock:
+            if ok:
+                self.processed += 1
+            else:
+                self.failed += 1
+            self.busy_seconds += seconds
+
+
+class Pipeline:
+    """Feeds a source iterable through a list of stages"""
+
+    def __init__(self, name, source, stages):
+        self.name = name
+        self.source = source
+        self.stages = stages
+        self.elapsed = 0.0
+        self.source_count = 0
+        self.source_error = None
+        self._start = None
+
+    def stage(self, name):
+        """Look up a stage by name"""
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    def run(self):
+        """Run every item through all stages and wait for the pipeline to drain"""
+        self._start = time.monotonic()
+        threads = []
+
+        for index, stage in enumerate(self.stages):
+            downstream = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work, args=(stage, downstream),
+                    name=f"{self.name}-{stage.name}-{worker}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        finished = threading.Event()
+        if PIPELINE_PROGRESS_SECONDS > 0:
+            threading.Thread(target=self._progress, args=(finished,), daemon=True).start()
+
+        self._feed()
+
+        for thread in threads:
+            thread.join()
+        finished.set()
+
+        self.elapsed = time.monotonic() - self._start
+        return self
+
+    def _feed(self):
+        """Push source items into the first stage, then signal end of stream"""
+        first = self.stages[0]
+        try:
+            for item in self.source:
+                self.source_count += 1
+                first.put(item)
+        except Exception as e:
+            self.source_error = e
+            print(f"❌ {self.name} pipeline source failed: {e}")
+        finally:
+            for _ in range(first.workers):
+                first.put(_DONE)
+
+    def _work(self, stage, downstream):
+        in_hand = False  # holding an item that hasn't been counted yet
+        try:
+            while True:
+                item = stage.queue.get()
+                if item is _DONE:
+                    break
+                in_hand = True
+
+                started = time.monotonic()
+                busy = None
+                try:
+                    result = stage.func(item)
+                    busy = time.monotonic() - started
+                    # Handing on counts too: a fan_out result can fail while it's iterated
+                    if downstream is not None and result is not None:
+                        for element in (result if stage.fan_out else (result,)):
+                            downstream.put(element)
+                    ok = True
+                except Exception as e:
+                    print(f"❌ {stage.name} failed: {e}")
+                    ok = False
+                stage._record(ok, time.monotonic() - started if busy is None else busy)
+                in_hand = False
+        finally:
+            # A worker that dies anyway still loses its item as failed and signals end of stream,
+            # otherwise run() would wait forever on the stages after it
+            if in_hand:
+                stage._record(False, 0.0)
+            with stage._lock:
+                stage._workers_left -= 1
+                last = stage._workers_left == 0
+            if last and downstream is not None:
+                for _ in range(downstream.workers):
+                    downstream.put(_DONE)
+
+    def _progress(self, finished):
+        while not finished.wait(PIPELINE_PROGRESS_SECONDS):
+            parts = [f"{stage.name}: {stage.processed} done, {stage.queue.qsize()} queued"
+                     for stage in self.stages]
+            print(f"📊 [{self.name}] " + " | ".join(parts))
+
+    def report(self):
+        """Print per-stage throughput and queue-depth counters"""
+        elapsed = self.elapsed or (time.monotonic() - self._start if self._start else 0.0)
+        print(f"\n📊 Pipeline stages ({elapsed:.1f}s, {self.source_count} items in):")
+        for stage in self.stages:
+            rate = stage.processed / elapsed if elapsed else 0.0
+            print(f"   {stage.name:<12} {stage.processed:>6} ok  {stage.failed:>4} failed  "
+                  f"{rate:>7.2f}/s  x{stage.workers} workers  "
+                  f"busy {stage.busy_seconds:.1f}s  max queue {stage.max_queue_depth}")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Overnight Personalization (Anthropic Message Batches)
+Submits tomorrow's email cohort to Claude as one Message Batch, waits for it
+to finish and stores the personalized email on each prospect, so the send
+run only does lookups instead of waiting on Claude.
+Author: Greg Pober
+
+Usage: python scripts/prepare_personalization.py
+Set ANTHROPIC_BASE_URL to point the batch calls at a local fake endpoint.
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+from iamcfo import clients, config, profiling
+from email_bot import (
+    BATCH_SIZE, prompt_cache_stats,
+    get_prospects_to_email, build_personalization_request, finish_personalization,
+    personalization_key, prepared_personalization
+)
+
+BATCH_POLL_INTERVAL = int(os.getenv('BATCH_POLL_INTERVAL', 60))  # Seconds between status checks
+BATCH_TIMEOUT = int(os.getenv('BATCH_TIMEOUT', 5 * 60 * 60))  # Give up after 5 hours (Actions job limit is 6)
+
+# Offline job: reads and writes prospects and calls Claude, never sends email
+REQUIRED_ENV = (config.SUPABASE_URL, config.SUPABASE_SERVICE_KEY, config.ANTHROPIC_API_KEY)
+
+
+def submit_batch(prospects):
+    """
+    Submit one Message Batch for every prospect without a current prepared email
+
+    Returns:
+        (batch, pending) - pending maps custom_id to (prospect, subject, format_values)
+    """
+    requests = []
+    pending = {}
+
+    for prospect in prospects:
+        if prepared_personalization(prospect):
+            continue
+
+        request_params, subject, format_values = build_personalization_request(prospect)
+        custom_id = str(prospect['id'])
+        requests.append({'custom_id': custom_id, 'params': request_params})
+        pending[custom_id] = (prospect, subject, format_values)
+
+    if not requests:
+        return None, pending
+
+    batch = clients.claude().messages.batches.create(requests=requests)
+    return batch, pending
+
+
+def wait_for_batch(batch_id):
+    """Poll until the batch has ended. Returns the final batch, or None on timeout"""
+    deadline = time.monotonic() + BATCH_TIMEOUT
+
+    while True:
+        batch = clients.claude().messages.batches.retrieve(batch_id)
+        if batch.processing_status == 'ended':
+            return batch
+
+        counts = batch.request_counts
+        print(f"  ⏳ {counts.processing} processing, {counts.succeeded} succeeded, {counts.errored} errored")
+
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(BATCH_POLL_INTERVAL)
+
+
+def cancel_batch(batch_id):
+    """Stop a batch we gave up on, so the next run's resubmission isn't paid for twice"""
+    try:
+        clients.claude().messages.batches.cancel(batch_id)
+        print(f"🛑 Canceled batch {batch_id}")
+    except Exception as e:
+        print(f"⚠️ Could not cancel batch {batch_id}: {e}")
+
+
+def store_results(batch_id, pending):
+    """Save each succeeded result on its prospect. Returns (stored, failed)"""
+    stored = 0
+    failed = 0
+
+    for entry in clients.claude().messages.batches.results(batch_id):
+        prospect, subject, format_values = pending[entry.custom_id]
+
+        if entry.result.type != 'succeeded':
+            print(f"⚠️ No personalization for {prospect['email']}: {entry.result.type}")
+            failed += 1
+            continue
+
+        prompt_cache_stats.record(entry.result.message.usage)
+
+        try:
+            html_body = finish_personalization(entry.result.message.content[0].text, format_values)
+
+            clients.supabase().table('prospects').update({
+                'personalized_subject': subject,
+                'personalized_html': html_body,
+                'personalized_key': personalization_key(prospect),
+                'personalized_at': datetime.now().isoformat()
+            }).eq('id', prospect['id']).execute()
+            stored += 1
+        except Exception as e:
+            print(f"❌ Failed to store personalization for {prospect['email']}: {e}")
+            failed += 1
+
+    return stored, failed
+
+
+def main():
+    """Main execution"""
+    config.require(*REQUIRED_ENV)
+    
+    print("=" * 60)
+    print("🌙 I AM CFO OVERNIGHT PERSONALIZATION - Message Batches")
+    print("=" * 60)
+    print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"📊 Cohort size: {BATCH_SIZE}")
+    print("-" * 60)
+
+    prospects = get_prospects_to_email(BATCH_SIZE)
+    if not prospects:
+        print("ℹ️ No prospects waiting to be emailed. Nothing to prepare.")
+        return
+
+    batch, pending = submit_batch(prospects)
+    if batch is None:
+        print(f"✅ All {len(prospects)} prospects are already personalized.")
+        return
+
+    print(f"📦 Submitted batch {batch.id} with {len(pending)} requests")
+
+    batch_id = batch.id
+    batch = wait_for_batch(batch_id)
+    if batch is None:
+        print(f"❌ Batch did not finish within {BATCH_TIMEOUT // 60} minutes.")
+        cancel_batch(batch_id)
+        print("   The send run will personalize these prospects live instead.")
+        sys.exit(1)
+
+    stored, failed = store_results(batch.id, pending)
+
+    print("\n" + "=" * 60)
+    print("✅ PERSONALIZATION READY!")
+    print("=" * 60)
+    print(f"   Stored: {stored}")
+    print(f"   Failed: {failed} (will be personalized live at send time)")
+    prompt_cache_stats.report()
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    profiling.run(main, 'prepare_personalization')
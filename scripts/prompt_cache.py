@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Claude Prompt Caching Helpers
+Marks the large static part of a prompt as cacheable and counts how often
+the API actually served it from cache during a run.
+Author: Greg Pober
+"""
+
+import threading
+
+
+def cached_system(text):
+    """System prompt block marked for Anthropic prompt caching"""
+    return [{
+        "type": "text",
+        "text": text,
+        "cache_control": {"type": "ephemeral"}
+    }]
+
+
+class PromptCacheStats:
+    """Thread-safe prompt cache hit/miss counters built from response usage"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.uncached_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, usage):
+        """Count one response's usage block"""
+        read = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        written = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+
+        with self._lock:
+            if read:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.cache_read_tokens += read
+            self.cache_write_tokens += written
+            self.uncached_tokens += getattr(usage, 'input_tokens', 0) or 0
+
+    def report(self):
+        """Print the end-of-run summary line"""
+        print(f"   Prompt cache: {self.hits} hits, {self.misses} misses "
+              f"({self.cache_read_tokens} tokens read from cache, "
+              f"{self.cache_write_tokens} written, {self.uncached_tokens} uncached)")
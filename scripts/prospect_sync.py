@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Incremental Prospect Sync
+Content hashes of uploaded prospect rows, so re-running upload_prospects
+with an updated vendor list only upserts rows that are new or changed.
+The hash covers the normalized fields we upload (not the status columns
+the bots write), so a prospect that was emailed since still counts as
+unchanged.
+Author: Greg Pober
+
+Stores (PROSPECT_HASHES):
+    file      - email -> hash lines in PROSPECT_HASHES_DIR, one file per Supabase project (default)
+    supabase  - prospects.content_hash (database/migrations/005_prospect_content_hash.sql),
+                fetched in bulk at start and written with each upserted row
+
+Usage:
+    hashes = open_store(supabase)
+    hashes.load()
+    diff = Differ(hashes)
+    send, seen = diff.filter(rows)   # new or changed rows only
+    ... upsert send ...
+    hashes.save(seen)
+    diff.report()
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from iamcfo import config
+
+PROSPECT_HASHES = os.getenv('PROSPECT_HASHES', 'file').lower()
+PROSPECT_HASHES_DIR = os.getenv('PROSPECT_HASHES_DIR', '.cache/prospect_hashes')
+PROSPECT_HASHES_PAGE_SIZE = int(os.getenv('PROSPECT_HASHES_PAGE_SIZE', 1000))  # Rows per bulk hash read
+
+HASH_COLUMN = 'content_hash'
+
+
+def row_hash(row):
+    """64-bit content hash of a normalized upload row, as hex"""
+    payload = json.dumps(row, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class FileHashes:
+    """email -> hash in a local append-only file, compacted when loaded"""
+
+    sends_hash = False
+
+    def __init__(self, directory, project_url):
+        # One file per Supabase project so staging and production never mix
+        project = hashlib.sha256((project_url or '').encode('utf-8')).hexdigest()[:12]
+        self.path = os.path.join(directory, f'{project}.tsv')
+        self.hashes = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    email, _, digest = line.rstrip('\n').partition('\t')
+                    if digest:
+                        self.hashes[email] = digest
+        # Rewrite without superseded lines, then append from here on
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f'{self.path}.tmp', 'w') as f:
+            f.writelines(f'{email}\t{digest}\n' for email, digest in self.hashes.items())
+        os.replace(f'{self.path}.tmp', self.path)
+        self._file = open(self.path, 'a')
+        return len(self.hashes)
+
+    def save(self, seen):
+        """Remember the (email, hash) pairs of rows that were upserted"""
+        with self._lock:
+            self._file.writelines(f'{email}\t{digest}\n' for email, digest in seen)
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+
+class SupabaseHashes:
+    """prospects.content_hash - read in bulk up front, written alongside each row"""
+
+    sends_hash = True
+
+    def __init__(self, supabase, page_size=PROSPECT_HASHES_PAGE_SIZE):
+        self.supabase = supabase
+        self.page_size = page_size
+        self.hashes = {}
+
+    def load(self):
+        # Keyset pagination: each page starts after the last email of the previous one
+        last = None
+        while True:
+            query = self.supabase.table('prospects').select(f'email,{HASH_COLUMN}')
+            if last is not None:
+                query = query.gt('email', last)
+            page = query.order('email').limit(self.page_size).execute().data
+            for row in page:
+                if row.get(HASH_COLUMN):
+                    self.hashes[row['email']] = row[HASH_COLUMN]
+            if len(page) < self.page_size:
+                return len(self.hashes)
+            last = page[-1]['email']
+
+    def save(self, seen):
+        pass  # content_hash went up with the rows
+
+    def close(self):
+        pass
+
+
+def open_store(supabase=None):
+    """Create the hash store selected by PROSPECT_HASHES"""
+    if PROSPECT_HASHES == 'supabase' and supabase is not None:
+        return SupabaseHashes(supabase)
+    return FileHashes(PROSPECT_HASHES_DIR, config.get(config.SUPABASE_URL))
+
+
+class Differ:
+    """Splits upload batches into new / changed / unchanged against a hash store"""
+
+    def __init__(self, store):
+        self.store = store
+        self.added = 0
+        self.changed = 0
+        self.unchanged = 0
+
+    def filter(self, rows):
+        """
+        (rows to send, [(email, hash)] to save once they land) for one batch
+
+        Unchanged rows are dropped. Rows carry content_hash only when the
+        store keeps it in the prospects table. A row that is sent becomes the
+        one later rows for its email are compared with.
+        """
+        known = self.store.hashes
+        send, seen = [], []
+        for row in rows:
+            digest = row_hash(row)
+            previous = known.get(row['email'])
+            if previous == digest:
+                self.unchanged += 1
+                continue
+            if previous is None:
+                self.added += 1
+            else:
+                self.changed += 1
+            known[row['email']] = digest
+            send.append(dict(row, **{HASH_COLUMN: digest}) if self.store.sends_hash else row)
+            seen.append((row['email'], digest))
+        return send, seen
+
+    def report(self):
+        print(f"🔁 Sync: {self.added} added, {self.changed} changed, {self.unchanged} unchanged (not sent)")
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Columnar Prospect Ingest
+Reads prospects with pyarrow and cleans them as column operations:
+trim every field, lowercase emails, fill the same defaults as
+upload_prospects.normalize_row, reject rows with a missing or malformed
+email, and drop in-file duplicate emails (the last row for an email wins,
+as it would with sequential upserts). Nothing is sent until the file is
+clean, so a batch can't contain the same email twice.
+Author: Greg Pober
+
+Inputs (only the prospect columns are read, a record batch at a time):
+    .csv                         pyarrow's streaming CSV reader
+    .parquet / .pq               memory-mapped
+    .arrow / .feather / .ipc     memory-mapped, zero-copy
+
+Every file takes two passes: the email column alone first (to find invalid
+and duplicate rows across the whole file), then the mapped columns a record
+batch at a time. Memory grows only with the email column (~100 bytes a row
+at peak), not with the rest of the file.
+
+pyarrow is optional (pip install pyarrow); without it upload_prospects
+streams CSVs row by row. It is imported by available() / open_source(), not
+at module load, so scripts that never read a file don't pay for it.
+
+Usage:
+    def report(rows, accepted, rejected):
+        write_rejected(rejected, 'prospects.csv.rejected.csv')
+
+    source = open_source('prospects.csv')   # or .parquet / .arrow
+    for offset, rows in stream_batches(source, 500, on_done=report): ...
+"""
+
+import os
+
+pa = pc = pa_csv = pq = None  # pyarrow modules, set by available()
+
+# prospects column -> value when the file has no such column (same as normalize_row)
+FIELD_DEFAULTS = {
+    'email': '',
+    'first_name': '',
+    'last_name': '',
+    'company': '',
+    'title': '',
+    'revenue_estimate': '$2M-$25M',
+    'industry': '',
+    'source': 'manual',
+}
+
+# Deliberately loose: one @, no whitespace, a dot in the domain
+EMAIL_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+
+FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'ipc',
+    '.feather': 'ipc',
+    '.ipc': 'ipc',
+    '.arrows': 'ipc',
+}
+
+READ_BATCH_ROWS = int(os.getenv('ARROW_READ_BATCH_ROWS', 65536))  # Parquet rows decoded per record batch
+CSV_BLOCK_BYTES = int(os.getenv('ARROW_CSV_BLOCK_BYTES', 1 << 20))  # CSV bytes parsed per record batch
+
+
+def available():
+    """Import pyarrow on first use. False when it isn't installed"""
+    global pa, pc, pa_csv, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.compute
+            import pyarrow.csv
+            import pyarrow.parquet
+        except ImportError:
+            return False
+        pa, pc, pa_csv, pq = pyarrow, pyarrow.compute, pyarrow.csv, pyarrow.parquet
+    return True
+
+
+def file_format(path):
+    """'csv', 'parquet' or 'ipc' from the file extension"""
+    return FORMATS.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+def clean(columns, length):
+    """
+    {name: array} as read -> table of the prospects columns, trimmed,
+    defaults filled, emails lowercased. Columns may be missing or typed
+    """
+    cleaned = {name: clean_column(columns.get(name), default, length) for name, default in FIELD_DEFAULTS.items()}
+    cleaned['email'] = pc.utf8_lower(cleaned['email'])
+    return pa.table(cleaned)
+
+
+def clean_column(column, default, length):
+    """Trimmed strings with nulls as default; a missing or all-null column is all default"""
+    if column is None or column.null_count == len(column):
+        return pa.repeat(pa.scalar(default), length)
+    if column.type != pa.string():
+        column = column.cast(pa.string())
+    return pc.fill_null(pc.utf8_trim_whitespace(column), default)
+
+
+def check_emails(email):
+    """
+    Cleaned email column -> (missing, invalid, duplicate, keep) boolean masks
+
+    keep is true for the last row of every valid email - the rows to upsert.
+    """
+    missing = pc.equal(email, '')
+    invalid = pc.and_(pc.invert(missing), pc.invert(pc.match_substring_regex(email, EMAIL_PATTERN)))
+    valid = pc.invert(pc.or_(missing, invalid))
+
+    # Sort (stable, so equal emails stay in file order) and flag the last of each run.
+    # Cheaper in memory than hashing every email into a group_by.
+    if len(email):
+        order = pc.sort_indices(email).cast(pa.int64())
+        ordered = email.take(order)
+        last = pa.chunked_array(pc.not_equal(ordered[:-1], ordered[1:]).chunks + [pa.array([True])])
+        keep = pc.and_(valid, last.take(pc.inverse_permutation(order)))
+    else:
+        keep = valid
+    duplicate = pc.and_(valid, pc.invert(keep))
+    return missing, invalid, duplicate, keep
+
+
+def accept(cleaned, keep):
+    """Rows to upsert: the kept rows plus uses_quickbooks"""
+    accepted = cleaned.filter(keep)
+    return accepted.append_column('uses_quickbooks', pa.repeat(pa.scalar(True), accepted.num_rows))
+
+
+def reject(cleaned, first_row, masks):
+    """Rejected rows of one cleaned table/slice. first_row is the 1-based number of its first row"""
+    rows = pa.array(range(first_row, first_row + cleaned.num_rows), pa.int64())
+    tables = []
+    for mask, reason in zip(masks, ('missing email', 'invalid email', 'duplicate email (a later row wins)')):
+        picked = cleaned.filter(mask)
+        tables.append(pa.table({
+            'row': rows.filter(mask),
+            'reason': pa.repeat(pa.scalar(reason), picked.num_rows),
+            **{name: picked[name] for name in FIELD_DEFAULTS},
+            'raw': pa.nulls(picked.num_rows, pa.string()),
+        }))
+    return pa.concat_tables(tables)
+
+
+def reject_malformed(malformed):
+    """Rejected-rows table for (line number, text) pairs the CSV reader skipped"""
+    return pa.table({
+        'row': pa.nulls(len(malformed), pa.int64()),
+        'reason': pa.array(['malformed row' if number is None else f'malformed row (line {number})'
+                            for number, _ in malformed], pa.string()),
+        **{name: pa.nulls(len(malformed), pa.string()) for name in FIELD_DEFAULTS},
+        'raw': pa.array([text for _, text in malformed], pa.string()),
+    })
+
+
+class CSVSource:
+    """CSV parsed block by block with pyarrow's streaming reader, prospect columns as strings"""
+
+    def __init__(self, path):
+        self.path = path
+        with pa_csv.open_csv(path, read_options=pa_csv.ReadOptions(block_size=1 << 16),
+                             parse_options=pa_csv.ParseOptions(invalid_row_handler=lambda row: 'skip')) as reader:
+            self.columns = [name for name in FIELD_DEFAULTS if name in reader.schema.names]
+        self.malformed = []  # (line number, text) of rows with the wrong number of fields, from the last pass
+
+    def batches(self, columns):
+        self.malformed = []
+
+        def skip_malformed(row):
+            self.malformed.append((row.number, row.text))
+            return 'skip'
+
+        reader = pa_csv.open_csv(
+            self.path,
+            read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+            parse_options=pa_csv.ParseOptions(invalid_row_handler=skip_malformed),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types={name: pa.string() for name in columns},
+                strings_can_be_null=False,
+            ),
+        )
+        with reader:
+            yield from reader
+
+
+class ParquetSource:
+    """Memory-mapped Parquet file, decoded a record batch at a time"""
+
+    def __init__(self, path):
+        self.file = pq.ParquetFile(path, memory_map=True)
+        self.columns = [name for name in FIELD_DEFAULTS if name in self.file.schema_arrow.names]
+
+    def batches(self, columns):
+        yield from self.file.iter_batches(batch_size=READ_BATCH_ROWS, columns=columns)
+
+
+class IPCSource:
+    """Memory-mapped Arrow IPC file (Feather v2) or stream - batches are zero-copy views"""
+
+    def __init__(self, path):
+        self.path = path
+        with pa.memory_map(path) as source:
+            self.columns = [name for name in FIELD_DEFAULTS if name in self._reader(source).schema.names]
+
+    @staticmethod
+    def _reader(source):
+        try:
+            return pa.ipc.open_file(source)
+        except pa.ArrowInvalid:
+            source.seek(0)
+            return pa.ipc.open_stream(source)
+
+    def batches(self, columns):
+        with pa.memory_map(self.path) as source:
+            reader = self._reader(source)
+            if isinstance(reader, pa.ipc.RecordBatchFileReader):
+                batches = (reader.get_batch(index) for index in range(reader.num_record_batches))
+            else:
+                batches = reader
+            for batch in batches:
+                yield batch.select(columns)
+
+
+SOURCES = {'csv': CSVSource, 'parquet': ParquetSource, 'ipc': IPCSource}
+
+
+def open_source(path):
+    """CSVSource, ParquetSource or IPCSource by extension. Raises ValueError without an email column"""
+    if not available():
+        raise ImportError("reading prospects with pyarrow needs pyarrow: pip install pyarrow")
+    source = SOURCES[file_format(path)](path)
+    if 'email' not in source.columns:
+        raise ValueError(f"{path} has no email column")
+    return source
+
+
+def stream_batches(source, batch_size, skip=(), on_done=None):
+    """
+    Clean a source into (offset, list of row dicts) upsert batches
+
+    offset counts accepted rows, so it is stable across runs of the same
+    file; batches whose offset is in skip are not converted. When the source
+    is exhausted, on_done(rows read, rows accepted, rejected table) is called.
+    """
+    # Pass 1: emails only, to find invalid rows and duplicates across the whole file
+    chunks = []
+    for batch in source.batches(['email']):
+        chunks.append(pc.utf8_lower(clean_column(batch.column('email'), '', batch.num_rows)))
+    masks = check_emails(pa.chunked_array(chunks, pa.string()))
+    del chunks
+
+    # Pass 2: the mapped columns, one record batch at a time
+    start, offset, accepted_rows = 0, 0, 0
+    pending = None
+    rejected = [reject(clean({}, 0), 1, [pa.array([], pa.bool_())] * 3)]  # keeps the schema for empty files
+    for batch in source.batches(source.columns):
+        length = batch.num_rows
+        cleaned = clean({name: batch.column(name) for name in source.columns}, length)
+        missing, invalid, duplicate, keep = (mask.slice(start, length) for mask in masks)
+        rejected.append(reject(cleaned, start + 1, (missing, invalid, duplicate)))
+        start += length
+
+        part = accept(cleaned, keep)
+        accepted_rows += part.num_rows
+        pending = part if pending is None else pa.concat_tables([pending, part])
+        while pending.num_rows >= batch_size:
+            if offset not in skip:
+                yield offset, pending.slice(0, batch_size).to_pylist()
+            offset += batch_size
+            pending = pending.slice(batch_size)
+
+    if pending is not None and pending.num_rows:
+        if offset not in skip:
+            yield offset, pending.to_pylist()
+
+    malformed = getattr(source, 'malformed', [])
+    if malformed:
+        rejected.append(reject_malformed(malformed))
+    if on_done:
+        on_done(start + len(malformed), accepted_rows, pa.concat_tables(rejected))
+
+
+def write_rejected(rejected, path):
+    """Write the rejected rows as CSV (nothing is written when there are none)"""
+    if rejected.num_rows:
+        pa_csv.write_csv(rejected.sort_by('row'), path)
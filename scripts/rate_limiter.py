@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+I AM CFO - Send Rate Limiter
+Spaces outbound sends evenly to hit a target emails-per-minute rate
+Author: Greg Pober
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Hand out evenly spaced send slots to concurrent worker threads"""
+
+    def __init__(self, rate_per_minute):
+        # 0 or less disables pacing entirely
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the caller's send slot comes up"""
+        if not self.interval:
+            return
+
+        # Reserve the next slot under the lock, then sleep outside it so
+        # other workers can queue up their own slots in the meantime
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
@@ -6,31 +6,18 @@ Author: Greg Pober
 """
 
 import os
-import sys
 from datetime import datetime, date, time
-from supabase import create_client, Client
-import anthropic
-import requests
 import json
+from iamcfo import clients, config, metrics, profiling, transport
+from prompt_cache import cached_system, PromptCacheStats
 
-# Initialize clients
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
-ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
+# Clients are created on first use (iamcfo.clients) - Anthropic only once a post is due
+REQUIRED_ENV = (config.SUPABASE_URL, config.SUPABASE_SERVICE_KEY, config.ANTHROPIC_API_KEY)
 LINKEDIN_ACCESS_TOKEN = os.getenv('LINKEDIN_ACCESS_TOKEN')  # We'll get this later
 LINKEDIN_ORG_ID = os.getenv('LINKEDIN_ORG_ID')  # Your company page ID
+LINKEDIN_API_URL = os.getenv('LINKEDIN_API_URL', 'https://api.linkedin.com')
 
-# Validate environment variables
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-    print("❌ ERROR: Supabase credentials not set!")
-    sys.exit(1)
-
-if not ANTHROPIC_API_KEY:
-    print("❌ ERROR: Anthropic API key not set!")
-    sys.exit(1)
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-claude = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+prompt_cache_stats = PromptCacheStats()
 
 # I AM CFO Brand Voice
 BRAND_VOICE = """
@@ -59,44 +46,10 @@ Avoid:
 - Fake enthusiasm
 """
 
-def get_pending_posts():
-    """Get posts scheduled for today that haven't been posted yet"""
-    try:
-        today = date.today().isoformat()
-        current_time = datetime.now().time()
-        
-        response = supabase.table('social_media_posts')\
-            .select('*')\
-            .eq('status', 'pending')\
-            .eq('scheduled_date', today)\
-            .eq('platform', 'linkedin')\
-            .execute()
-        
-        # Filter by time (should be at or past scheduled time)
-        posts = []
-        for post in response.data:
-            scheduled_time_str = post.get('scheduled_time', '09:00:00')
-            scheduled_time = datetime.strptime(scheduled_time_str, '%H:%M:%S').time()
-            if current_time >= scheduled_time:
-                posts.append(post)
-        
-        return posts
-    except Exception as e:
-        print(f"❌ Error fetching pending posts: {e}")
-        return []
+# Static part of every post prompt - sent as a cached system prompt
+POST_SYSTEM_PROMPT = f"""{BRAND_VOICE}
 
-def generate_post_with_claude(post_topic):
-    """Use Claude to generate LinkedIn post from topic"""
-    try:
-        message = claude.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=2048,
-            messages=[{
-                "role": "user",
-                "content": f"""{BRAND_VOICE}
-
-Create a LinkedIn post for I AM CFO based on this topic:
-"{post_topic}"
+You will be given a topic. Create a LinkedIn post for I AM CFO based on it.
 
 Requirements:
 1. 100-200 words (LinkedIn sweet spot)
@@ -114,11 +67,57 @@ DO NOT include:
 - Markdown formatting
 - Your explanations
 
-Just write the post exactly as it should appear on LinkedIn.
+Just write the post exactly as it should appear on LinkedIn."""
+
+def filter_due_posts(posts, current_time):
+    """Posts whose scheduled time is at or before current_time"""
+    due = []
+    for post in posts:
+        scheduled_time_str = post.get('scheduled_time', '09:00:00')
+        scheduled_time = datetime.strptime(scheduled_time_str, '%H:%M:%S').time()
+        if current_time >= scheduled_time:
+            due.append(post)
+    
+    return due
+
+def get_pending_posts():
+    """Get posts scheduled for today that haven't been posted yet"""
+    try:
+        today = date.today().isoformat()
+        current_time = datetime.now().time()
+        
+        query = clients.supabase().table('social_media_posts')\
+            .select('*')\
+            .eq('status', 'pending')\
+            .eq('scheduled_date', today)\
+            .eq('platform', 'linkedin')
+        with metrics.timer('fetch') as timer:
+            response = query.execute()
+            timer.items = len(response.data)
+        
+        return filter_due_posts(response.data, current_time)
+    except Exception as e:
+        print(f"❌ Error fetching pending posts: {e}")
+        return []
+
+def generate_post_with_claude(post_topic):
+    """Use Claude to generate LinkedIn post from topic"""
+    try:
+        claude = clients.claude()  # first call imports the SDK - keep that out of the timing
+        with metrics.timer('personalize'):
+            message = claude.messages.create(
+                model="claude-sonnet-4-20250514",
+                max_tokens=2048,
+                system=cached_system(POST_SYSTEM_PROMPT),
+                messages=[{
+                    "role": "user",
+                    "content": f"""Topic:
+"{post_topic}"
 
 LinkedIn post:"""
-            }]
-        )
+                }]
+            )
+        prompt_cache_stats.record(message.usage)
         
         post_content = message.content[0].text.strip()
         
@@ -150,7 +149,7 @@ def post_to_linkedin(content, image_url=None):
     
     try:
         # LinkedIn API endpoint for organization posts
-        url = "https://api.linkedin.com/v2/ugcPosts"
+        url = f"{LINKEDIN_API_URL}/v2/ugcPosts"
         
         headers = {
             "Authorization": f"Bearer {LINKEDIN_ACCESS_TOKEN}",
@@ -186,7 +185,10 @@ def post_to_linkedin(content, image_url=None):
             ]
         
         # Post to LinkedIn
-        response = requests.post(url, headers=headers, json=post_data)
+        with metrics.timer('send') as timer:
+            response = transport.post(url, headers=headers, json=post_data)
+            if response.status_code not in [200, 201]:
+                timer.fail()
         
         if response.status_code in [200, 201]:
             post_id = response.json().get('id')
@@ -228,10 +230,11 @@ def update_post_status(post_id, status, generated_content=None, post_url=None, e
         if error:
             update_data['error_message'] = error
         
-        supabase.table('social_media_posts')\
-            .update(update_data)\
-            .eq('id', post_id)\
-            .execute()
+        with metrics.timer('db_update'):
+            clients.supabase().table('social_media_posts')\
+                .update(update_data)\
+                .eq('id', post_id)\
+                .execute()
         
         return True
     except Exception as e:
@@ -240,6 +243,9 @@ def update_post_status(post_id, status, generated_content=None, post_url=None, e
 
 def main():
     """Main execution"""
+    config.require(*REQUIRED_ENV)
+    metrics.start('social_media_bot')
+    
     print("=" * 60)
     print("🤖 I AM CFO SOCIAL MEDIA BOT")
     print("=" * 60)
@@ -308,9 +314,14 @@ def main():
     print("=" * 60)
     print(f"   Posted: {posted_count}")
     print(f"   Failed: {failed_count}")
+    prompt_cache_stats.report()
+    metrics.finish()
     if posted_count > 0:
         print(f"   Check LinkedIn: https://www.linkedin.com/company/i-am-cfo")
     print("=" * 60)
 
 if __name__ == '__main__':
-    main()
+    try:
+        profiling.run(main, 'social_media_bot')
+    finally:
+        transport.close()
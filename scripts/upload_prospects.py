@@ -1,57 +1,338 @@
 #!/usr/bin/env python3
 """
-Upload prospects from CSV to Supabase
-Usage: python scripts/upload_prospects.py prospects.csv
+Upload prospects from CSV, Parquet or Arrow IPC/Feather to Supabase
+Usage: python scripts/upload_prospects.py prospects.csv [--workers 8] [--batch-size 500] [--restart]
+                                                       [--engine auto|arrow|rows]
+       python scripts/upload_prospects.py enriched.parquet
+       python scripts/upload_prospects.py updated_list.csv --sync
+
+With pyarrow installed (engine arrow, the default when available) only the
+prospect columns are read, in record batches that are cleaned column-wise as
+they stream into the upload: invalid and missing emails and in-file
+duplicates are dropped and listed in <file>.rejected.csv. Parquet and Arrow
+files are memory-mapped and need pyarrow. Without it (engine rows) the CSV
+is read row by row and upserted UPLOAD_BATCH_SIZE at a time; a batch that
+repeats an email from a batch still in flight waits for it, so the last row
+wins.
+Batches are sent by UPLOAD_WORKERS threads, each retried with exponential
+backoff. Every batch that lands is recorded in a checkpoint file next to the
+input, so rerunning after a crash or a failed batch only sends what is
+missing.
+
+With --sync (UPLOAD_SYNC=true) each row's content hash is compared with the
+hashes from earlier uploads (see prospect_sync.py) and only new or changed
+rows are upserted.
 """
 
 import sys
 import csv
 import os
-from supabase import create_client, Client
-
-def upload_prospects(csv_file):
-    supabase: Client = create_client(
-        os.getenv('SUPABASE_URL'),
-        os.getenv('SUPABASE_SERVICE_KEY')
-    )
-    
-    print(f"📁 Reading {csv_file}...")
-    
-    prospects = []
-    with open(csv_file, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            prospects.append({
-                'email': row['email'].strip().lower(),
-                'first_name': row.get('first_name', '').strip(),
-                'last_name': row.get('last_name', '').strip(),
-                'company': row.get('company', '').strip(),
-                'title': row.get('title', '').strip(),
-                'revenue_estimate': row.get('revenue_estimate', '$2M-$25M').strip(),
-                'industry': row.get('industry', '').strip(),
-                'source': row.get('source', 'manual').strip(),
-                'uses_quickbooks': True
-            })
-    
-    print(f"✅ Found {len(prospects)} prospects")
-    
-    uploaded = 0
-    batch_size = 100
-    
-    for i in range(0, len(prospects), batch_size):
-        batch = prospects[i:i + batch_size]
+import time
+import json
+import random
+import argparse
+import threading
+from iamcfo import clients, config, profiling
+from pipeline import Pipeline, Stage
+import prospect_table
+import prospect_sync
+
+UPLOAD_BATCH_SIZE = int(os.getenv('UPLOAD_BATCH_SIZE', 100))  # Rows per upsert request
+UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', 4))  # Upserts in flight at once
+UPLOAD_RETRIES = int(os.getenv('UPLOAD_RETRIES', 5))  # Attempts per batch before giving up on it
+UPLOAD_BACKOFF_SECONDS = float(os.getenv('UPLOAD_BACKOFF_SECONDS', 1))  # First retry delay, doubled each time
+UPLOAD_BACKOFF_MAX_SECONDS = float(os.getenv('UPLOAD_BACKOFF_MAX_SECONDS', 30))
+UPLOAD_ENGINE = os.getenv('UPLOAD_ENGINE', 'auto').lower()  # arrow (pyarrow, columnar), rows, or auto
+UPLOAD_SYNC = os.getenv('UPLOAD_SYNC', 'false').lower() == 'true'  # Only upsert new or changed rows
+
+def normalize_row(row):
+    """CSV row -> prospects table row"""
+    return {
+        'email': row['email'].strip().lower(),
+        'first_name': row.get('first_name', '').strip(),
+        'last_name': row.get('last_name', '').strip(),
+        'company': row.get('company', '').strip(),
+        'title': row.get('title', '').strip(),
+        'revenue_estimate': row.get('revenue_estimate', '$2M-$25M').strip(),
+        'industry': row.get('industry', '').strip(),
+        'source': row.get('source', 'manual').strip(),
+        'uses_quickbooks': True
+    }
+
+class CSVBatches:
+    """
+    The CSV streamed as (offset, rows) batches, none racing an earlier batch for an email
+
+    offset is the index of the batch's first data row. Batches whose offset is
+    in skip are read past without being normalized. An email repeated within a
+    batch is sent once (the later row wins) - Postgres rejects an upsert that
+    touches the same row twice. Batches land in any order, so a batch sharing
+    an email with one still in flight waits until that one has landed(), and
+    the file's last row for an email wins as with sequential upserts. If the
+    earlier batch failed(), the later one is left for the rerun too, which
+    sends both in order. Memory holds the emails of the batches in flight.
+    """
+
+    def __init__(self, csv_file, batch_size=UPLOAD_BATCH_SIZE, skip=()):
+        self.csv_file = csv_file
+        self.batch_size = batch_size
+        self.skip = skip
+        self.held_back = 0  # batches left for the rerun because an earlier batch failed
+        self._in_flight = {}  # offset -> emails of a batch sent but not yet landed
+        self._emails = set()  # union of the in-flight emails (in-flight batches never share one)
+        self._blocked = set()  # emails of batches that failed or were held back this run
+        self._changed = threading.Condition()
+
+    def __iter__(self):
+        with open(self.csv_file, 'r', newline='') as f:
+            offset, batch = 0, []
+            for index, row in enumerate(csv.DictReader(f)):
+                if index - offset == self.batch_size:
+                    if offset not in self.skip:
+                        yield from self._send(offset, dedupe(batch))
+                    offset, batch = index, []
+                if offset not in self.skip:
+                    batch.append(normalize_row(row))
+            if batch:
+                yield from self._send(offset, dedupe(batch))
+
+    def _send(self, offset, batch):
+        emails = {row['email'] for row in batch}
+        with self._changed:
+            self._changed.wait_for(lambda: self._emails.isdisjoint(emails) or not self._blocked.isdisjoint(emails))
+            if not self._blocked.isdisjoint(emails):
+                self._blocked |= emails
+                self.held_back += 1
+                print(f"⚠️ Batch at row {offset} repeats emails from a failed batch - leaving it for the rerun")
+                return
+            self._in_flight[offset] = emails
+            self._emails |= emails
+        yield offset, batch
+
+    def landed(self, offset):
+        """The batch at offset is in the database - batches repeating its emails can go"""
+        with self._changed:
+            self._emails -= self._in_flight.pop(offset, set())
+            self._changed.notify_all()
+
+    def failed(self, offset):
+        """The batch at offset didn't land - batches repeating its emails wait for the rerun"""
+        with self._changed:
+            emails = self._in_flight.pop(offset, set())
+            self._emails -= emails
+            self._blocked |= emails
+            self._changed.notify_all()
+
+def dedupe(batch):
+    """Drop earlier rows for an email that appears again later in the batch"""
+    unique = {row['email']: row for row in batch}
+    return batch if len(unique) == len(batch) else list(unique.values())
+
+class Checkpoint:
+    """
+    Append-only record of the batch offsets already upserted
+
+    The first line describes the upload (file size, batch size, engine); a
+    checkpoint written for a different upload is ignored.
+    """
+
+    def __init__(self, path, input_path, batch_size, engine):
+        self.path = path
+        self.header = {'file': os.path.abspath(input_path), 'size': os.path.getsize(input_path),
+                       'batch_size': batch_size, 'engine': engine}
+        self.done = set()
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Read completed offsets from an earlier run. Returns how many there were"""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path) as f:
+            lines = f.read().splitlines()
+        if not lines or json.loads(lines[0]) != self.header:
+            print(f"⚠️ Checkpoint {self.path} is for a different file, batch size or engine - starting over")
+            return 0
+        # A torn last line (killed mid-write) is just a batch we'll send again
+        self.done = {int(line) for line in lines[1:] if line.isdigit()}
+        return len(self.done)
+
+    def open(self, resume):
+        if not resume or not self.done:
+            self.done = set()
+            with open(self.path, 'w') as f:
+                f.write(json.dumps(self.header) + '\n')
+        self._file = open(self.path, 'a')
+
+    def record(self, offset):
+        with self._lock:
+            self.done.add(offset)
+            self._file.write(f"{offset}\n")
+            self._file.flush()
+
+    def close(self, complete):
+        if self._file:
+            self._file.close()
+        if complete:
+            os.remove(self.path)
+
+def upsert_with_retry(supabase, batch, offset, retries=UPLOAD_RETRIES):
+    """Upsert one batch, backing off 1s, 2s, 4s... (with jitter) between attempts"""
+    for attempt in range(1, retries + 1):
         try:
             supabase.table('prospects').upsert(batch, on_conflict='email').execute()
-            uploaded += len(batch)
-            print(f"✅ Uploaded batch {i//batch_size + 1}: {len(batch)} prospects")
+            return
         except Exception as e:
-            print(f"❌ Error: {e}")
-    
-    print(f"🎉 Upload complete! {uploaded} prospects")
+            if attempt == retries:
+                raise RuntimeError(f"batch at row {offset} failed after {retries} attempts: {e}") from e
+            delay = min(UPLOAD_BACKOFF_MAX_SECONDS, UPLOAD_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            delay *= random.uniform(0.5, 1.0)
+            print(f"⚠️ Batch at row {offset} failed (attempt {attempt}/{retries}): {e} - retrying in {delay:.1f}s")
+            time.sleep(delay)
 
-if __name__ == '__main__':
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/upload_prospects.py prospects.csv")
+def choose_engine(engine):
+    if engine == 'auto':
+        return 'arrow' if prospect_table.available() else 'rows'
+    if engine == 'arrow' and not prospect_table.available():
+        print("❌ Parquet/Arrow input and --engine arrow need pyarrow: pip install pyarrow")
         sys.exit(1)
+    return engine
+
+def stream_clean_batches(source, path, batch_size, skip):
+    """Columnar path: record batches of the prospect columns, cleaned as they stream"""
+    started = time.monotonic()
+    print(f"🗂️ Reading columns {', '.join(source.columns)} from {path}")
+    def done(rows, accepted, rejected):
+        report_cleaning(path, rows, accepted, rejected, time.monotonic() - started)
+    return prospect_table.stream_batches(source, batch_size, skip, on_done=done)
+
+def report_cleaning(path, rows, accepted, rejected, elapsed):
+    print(f"🧹 Cleaned {rows} rows in {elapsed:.2f}s: {accepted} accepted, {rejected.num_rows} rejected")
+    rejected_path = f"{path}.rejected.csv"
+    if rejected.num_rows:
+        prospect_table.write_rejected(rejected, rejected_path)
+        print(f"⚠️ Rejected rows written to {rejected_path}")
+    elif os.path.exists(rejected_path):
+        os.remove(rejected_path)
+
+def upload_prospects(path, batch_size=UPLOAD_BATCH_SIZE, workers=UPLOAD_WORKERS,
+                     checkpoint_path=None, resume=True, engine=UPLOAD_ENGINE, sync=UPLOAD_SYNC):
+    """Upload a CSV, Parquet or Arrow IPC file. Returns True if every batch landed"""
+    config.require(config.SUPABASE_URL, config.SUPABASE_SERVICE_KEY)
+    file_format = prospect_table.file_format(path)
+    engine = choose_engine('arrow' if file_format != 'csv' else engine)
+    source = None
+    if engine == 'arrow':
+        try:
+            source = prospect_table.open_source(path)
+        except (OSError, ValueError) as e:
+            print(f"❌ Can't read {path}: {e}")
+            return False
+    supabase = clients.supabase()
+    
+    checkpoint = Checkpoint(checkpoint_path or f"{path}.checkpoint", path, batch_size, engine)
+    if resume and checkpoint.load():
+        print(f"♻️ Resuming: {len(checkpoint.done)} batches already uploaded ({checkpoint.path})")
+    checkpoint.open(resume)
+    
+    if source is not None:
+        batches = stream_clean_batches(source, path, batch_size, checkpoint.done)
+    else:
+        batches = CSVBatches(path, batch_size, skip=checkpoint.done)
+    print(f"📁 Uploading {path} in batches of {batch_size}, {workers} workers ({engine} engine)...")
+    
+    hashes = differ = None
+    if sync:
+        hashes = prospect_sync.open_store(supabase)
+        print(f"🔁 Sync mode: {hashes.load()} known prospect hashes")
+        differ = prospect_sync.Differ(hashes)
+    
+    progress = {'rows': 0, 'batches': 0}
+    started = time.monotonic()
+    
+    def settle(offset, landed):
+        # The row engine holds back batches that repeat an email still in flight
+        if source is None:
+            (batches.landed if landed else batches.failed)(offset)
+    
+    def diff(item):
+        offset, batch = item
+        try:
+            send, seen = differ.filter(batch)
+        except Exception:
+            settle(offset, False)
+            raise
+        return offset, send, seen
     
-    upload_prospects(sys.argv[1])
+    def upload(item):
+        offset, batch = item[:2]
+        try:
+            if batch:
+                upsert_with_retry(supabase, batch, offset)
+        except Exception:
+            settle(offset, False)
+            raise
+        return item
+    
+    def record(item):
+        offset, batch = item[:2]
+        try:
+            checkpoint.record(offset)
+            if hashes is not None:
+                hashes.save(item[2])
+        finally:
+            settle(offset, True)
+        progress['rows'] += len(batch)
+        progress['batches'] += 1
+        if batch:
+            elapsed = time.monotonic() - started
+            print(f"✅ Uploaded batch at row {offset}: {len(batch)} prospects "
+                  f"({progress['rows']} total, {progress['rows'] / elapsed if elapsed else 0:,.0f} rows/sec)")
+    
+    stages = [
+        Stage('upsert', upload, workers=workers, queue_size=workers * 2),
+        Stage('checkpoint', record),
+    ]
+    if sync:
+        stages.insert(0, Stage('diff', diff))
+    pipeline = Pipeline('upload', batches, stages)
+    pipeline.run()
+    pipeline.report()
+    if sync:
+        hashes.close()
+        differ.report()
+    
+    failed = sum(stage.failed for stage in stages) + (batches.held_back if source is None else 0)
+    complete = failed == 0 and pipeline.source_error is None and pipeline.source_count == progress['batches']
+    checkpoint.close(complete)
+    
+    elapsed = pipeline.elapsed
+    summary = f"{progress['rows']} prospects in {elapsed:.1f}s ({progress['rows'] / elapsed if elapsed else 0:,.0f} rows/sec)"
+    if complete:
+        print(f"🎉 Upload complete! {summary}")
+    else:
+        print(f"❌ Upload incomplete: {summary}, {failed} batches failed - "
+              f"run again to upload only what is missing ({checkpoint.path})")
+    return complete
+
+def main():
+    parser = argparse.ArgumentParser(description='Upload prospects from CSV, Parquet or Arrow IPC to Supabase')
+    parser.add_argument('path', help='prospects file: .csv, .parquet/.pq or .arrow/.feather/.ipc '
+                                     '(email, first_name, last_name, company, ...)')
+    parser.add_argument('--batch-size', type=int, default=UPLOAD_BATCH_SIZE, help='rows per upsert')
+    parser.add_argument('--workers', type=int, default=UPLOAD_WORKERS, help='upserts in flight at once')
+    parser.add_argument('--checkpoint', help='checkpoint file (default: <path>.checkpoint)')
+    parser.add_argument('--restart', action='store_true', help='ignore any checkpoint and upload everything')
+    parser.add_argument('--engine', choices=('auto', 'arrow', 'rows'), default=UPLOAD_ENGINE,
+                        help='arrow: columnar clean + dedupe (needs pyarrow); rows: row by row, no pyarrow needed')
+    parser.add_argument('--sync', action='store_true', default=UPLOAD_SYNC,
+                        help='only upsert rows that are new or changed since the last upload')
+    parser.epilog = 'Add --profile[=cpu,sample,memory] to profile the run.'
+    args = parser.parse_args()
+    
+    ok = upload_prospects(args.path, args.batch_size, args.workers, args.checkpoint,
+                          resume=not args.restart, engine=args.engine, sync=args.sync)
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    profiling.run(main, 'upload_prospects')